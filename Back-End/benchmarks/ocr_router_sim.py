@@ -0,0 +1,82 @@
+# benchmarks/ocr_router_sim.py
+"""
+Drives utils.provider_router with fake local providers to show how the
+breaker and hedging behave, without touching Gemini or Groq.
+
+    python -m benchmarks.ocr_router_sim --scenario outage
+    python -m benchmarks.ocr_router_sim --scenario slow --requests 200
+
+Scenarios:
+  healthy  primary answers quickly
+  slow     primary has a long tail (1 in 10 calls takes 2s)
+  outage   primary fails every call after the first 20
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from utils.provider_router import ProviderRouter
+
+
+def fake_provider(name: str, latency: float, tail_latency: float = None,
+                  tail_rate: float = 0.0, fail_after: int = None):
+    calls = 0
+
+    async def call(request_id):
+        nonlocal calls
+        calls += 1
+        if fail_after is not None and calls > fail_after:
+            await asyncio.sleep(latency)
+            raise RuntimeError(f"{name} unavailable")
+        slow = tail_latency is not None and random.random() < tail_rate
+        await asyncio.sleep(tail_latency if slow else latency * random.uniform(0.8, 1.2))
+        return f"{name}:{request_id}"
+
+    return call
+
+
+SCENARIOS = {
+    "healthy": dict(latency=0.05),
+    "slow": dict(latency=0.05, tail_latency=2.0, tail_rate=0.1),
+    "outage": dict(latency=0.5, fail_after=20),
+}
+
+
+async def main(args):
+    router = ProviderRouter(
+        "sim",
+        [
+            ("primary", fake_provider("primary", **SCENARIOS[args.scenario])),
+            ("fallback", fake_provider("fallback", latency=0.15)),
+        ],
+        failure_threshold=3,
+        cooldown=args.cooldown,
+        min_samples=10,
+        default_hedge_delay=1.0,
+        min_hedge_delay=0.05
+    )
+
+    latencies = []
+    for request_id in range(args.requests):
+        started = time.perf_counter()
+        try:
+            await router.call(request_id)
+        except Exception:
+            pass
+        latencies.append(time.perf_counter() - started)
+
+    ordered = sorted(latencies)
+    print(f"[ROUTER SIM] {args.scenario}: {args.requests} requests, "
+          f"mean {statistics.mean(latencies) * 1000:.0f} ms, "
+          f"p95 {ordered[int(len(ordered) * 0.95)] * 1000:.0f} ms, "
+          f"max {ordered[-1] * 1000:.0f} ms")
+    print(f"[ROUTER SIM] {router.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="outage")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--cooldown", type=float, default=2.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,97 @@
+# benchmarks/upload_load_test.py
+"""
+Fires concurrent /upload requests at a running backend while probing a cheap
+endpoint, to check the event loop stays responsive under upload bursts.
+
+    python -m benchmarks.upload_load_test --lecture-instance-id <id> \
+        --users-file users.txt --image sample.jpg --base-url http://localhost:8000
+
+users.txt holds one enrolled student user_id per line (one upload each).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+
+async def _upload(client, user_id, lecture_instance_id, image_bytes, results):
+    started = time.perf_counter()
+    try:
+        res = await client.post("/upload", data={
+            "user_id": user_id,
+            "lecture_instance_id": lecture_instance_id
+        }, files={"file": ("upload.jpg", image_bytes, "image/jpeg")})
+        results.append((res.status_code, time.perf_counter() - started))
+    except httpx.HTTPError as e:
+        print("[LOAD TEST] Upload error:", e)
+        results.append((None, time.perf_counter() - started))
+
+
+async def _probe(client, stop, latencies, interval):
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            await client.get("/openapi.json")
+            latencies.append(time.perf_counter() - started)
+        except httpx.HTTPError as e:
+            print("[LOAD TEST] Probe error:", e)
+        await asyncio.sleep(interval)
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def main(args):
+    with open(args.users_file) as f:
+        users = [line.strip() for line in f if line.strip()][:args.uploads]
+
+    with open(args.image, "rb") as f:
+        image_bytes = f.read()
+
+    limits = httpx.Limits(max_connections=len(users) + 5)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=120, limits=limits) as client:
+        stop = asyncio.Event()
+        probe_latencies = []
+        probe = asyncio.create_task(_probe(client, stop, probe_latencies, args.probe_interval))
+
+        results = []
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _upload(client, user_id, args.lecture_instance_id, image_bytes, results)
+            for user_id in users
+        ))
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        await probe
+
+    upload_latencies = [t for _, t in results]
+    statuses = {}
+    for code, _ in results:
+        statuses[code] = statuses.get(code, 0) + 1
+
+    print(f"Uploads: {len(results)} in {elapsed:.2f}s, status codes: {statuses}")
+    print(f"Upload latency  p50={_percentile(upload_latencies, 50):.3f}s "
+          f"p99={_percentile(upload_latencies, 99):.3f}s")
+    print(f"Probe latency   p50={_percentile(probe_latencies, 50) * 1000:.1f}ms "
+          f"p99={_percentile(probe_latencies, 99) * 1000:.1f}ms "
+          f"max={max(probe_latencies, default=0) * 1000:.1f}ms "
+          f"samples={len(probe_latencies)}")
+    if probe_latencies:
+        print(f"Probe mean      {statistics.mean(probe_latencies) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--lecture-instance-id", required=True)
+    parser.add_argument("--users-file", required=True)
+    parser.add_argument("--image", required=True)
+    parser.add_argument("--uploads", type=int, default=100)
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
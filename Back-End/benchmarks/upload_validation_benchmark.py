@@ -0,0 +1,116 @@
+# benchmarks/upload_validation_benchmark.py
+"""
+Compares the database side of /upload before and after the
+validate_and_create_submission RPC, against a real Supabase project:
+
+  chain  get_lecture_instance, get_attendance_record, get_existing_submission,
+         create_submission, update_attendance_record (5 round trips)
+  rpc    validate_and_create_submission (1 round trip)
+
+    python -m benchmarks.upload_validation_benchmark --lecture-instance-id <id> \
+        --users-file users.txt --concurrency 50
+
+users.txt holds one enrolled student user_id per line. Use a live test
+lecture: each user gets a submission created and deleted once per mode, and
+their attendance is left at PENDING. Storage is not touched, since both
+versions upload the file the same way.
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import database_function as db
+
+IMAGE_URL = "benchmark://upload-validation"
+
+
+def _chain(user_id: str, lecture_instance_id: str):
+    lecture = db.get_lecture_instance(lecture_instance_id)
+    if not lecture.data:
+        return None, "LECTURE_NOT_FOUND"
+    if lecture.data["attendance_locked"] or lecture.data["status"] != "live":
+        return None, "LECTURE_NOT_ACCEPTING"
+
+    attendance = db.get_attendance_record(user_id, lecture_instance_id)
+    if not attendance.data:
+        return None, "NOT_ENROLLED"
+    if attendance.data["decision"] == "ABSENT":
+        return None, "MARKED_ABSENT"
+
+    if db.get_existing_submission(user_id, lecture_instance_id).data:
+        return None, "DUPLICATE_SUBMISSION"
+
+    record = db.create_submission({
+        "user_id": user_id,
+        "lecture_instance_id": lecture_instance_id,
+        "uploaded_at": datetime.now().isoformat(),
+        "image_url": IMAGE_URL,
+        "status": "pending"
+    })
+    db.update_attendance_record(user_id, lecture_instance_id, {
+        "decision": "PENDING",
+        "updated_at": "now()"
+    })
+    return record.data[0]["id"], None
+
+
+def _rpc(user_id: str, lecture_instance_id: str):
+    result = db.validate_and_create_submission(
+        user_id, lecture_instance_id, IMAGE_URL, datetime.now().isoformat()
+    ).data[0]
+    return result["submission_id"], result["error_code"]
+
+
+MODES = {"chain": _chain, "rpc": _rpc}
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(mode: str, users: list, lecture_instance_id: str, concurrency: int):
+    call = MODES[mode]
+
+    def timed(user_id):
+        started = time.perf_counter()
+        submission_id, error_code = call(user_id, lecture_instance_id)
+        return submission_id, error_code, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, users))
+    elapsed = time.perf_counter() - started
+
+    created = [submission_id for submission_id, _, _ in results if submission_id]
+    if created:
+        db.supabase.table("submissions").delete().in_("id", created).execute()
+
+    latencies = [t for _, _, t in results]
+    outcomes = {}
+    for _, error_code, _ in results:
+        outcomes[error_code or "CREATED"] = outcomes.get(error_code or "CREATED", 0) + 1
+
+    print(f"[UPLOAD BENCH] {mode}: {len(results)} uploads in {elapsed:.2f}s, outcomes {outcomes}")
+    print(f"[UPLOAD BENCH] {mode}: p50={_percentile(latencies, 50) * 1000:.1f}ms "
+          f"p99={_percentile(latencies, 99) * 1000:.1f}ms "
+          f"mean={statistics.mean(latencies) * 1000:.1f}ms")
+
+
+def main(args):
+    with open(args.users_file) as f:
+        users = [line.strip() for line in f if line.strip()][:args.uploads]
+
+    for mode in args.modes.split(","):
+        run(mode, users, args.lecture_instance_id, args.concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lecture-instance-id", required=True)
+    parser.add_argument("--users-file", required=True)
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--modes", default="chain,rpc")
+    main(parser.parse_args())
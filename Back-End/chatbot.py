@@ -1,16 +1,20 @@
-from groq import Groq
-from dotenv import load_dotenv
+import asyncio
 import os
-load_dotenv()
-
-client = Groq(
-    api_key=os.getenv("GROQ_API_KEY")
-)
-async def chat(teacher_context, user_message):
-    system_prompt = {
-    "role": "system",
-    "content":
-    f"""
+import uuid
+from utils import providers, token_budget, rate_limiter
+from utils.ttl_cache import TTLCache
+
+CHAT_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+MAX_TOKENS = 200
+SUMMARY_MAX_TOKENS = 300
+
+CHAT_SESSION_TTL = int(os.getenv("CHAT_SESSION_TTL", "1800"))
+CHAT_SESSION_MAX_ENTRIES = int(os.getenv("CHAT_SESSION_MAX_ENTRIES", "1000"))
+# Messages kept verbatim when older turns are folded into the summary.
+RECENT_MESSAGES = 4
+
+# Static instructions first so the prefix is identical for every teacher.
+SYSTEM_PROMPT = """
 You are an AI assistant for a teacher.
 You are a chatbot.
 You are a teacher assistant.
@@ -18,17 +22,138 @@ You should not repond like "..Okay, let's tackle the user's question...."
 You should repond concise
 You should not create your own context or data.
 Use ONLY the provided context.
+The context is given as tables: a header line with the column names, then one row per line, columns separated by " | ". "-" means no value.
 Date is in indian format dd-mm-yyyy.
 If data is missing, say so clearly.
+"""
 
-Context:
-{teacher_context}
+SUMMARY_PROMPT = """
+Summarize this conversation between a teacher and their assistant.
+Keep every number, student name, class code, date and open question.
+Be concise. Output only the summary.
 """
-}
-    chat_history = [system_prompt]
-    chat_history.append({"role": "user", "content": user_message})
-    response = client.chat.completions.create(model="meta-llama/llama-4-scout-17b-16e-instruct",
-                                            messages=chat_history,
-                                            max_tokens=200)
-  
-    return response.choices[0].message.content
\ No newline at end of file
+
+# Sessions expire CHAT_SESSION_TTL after their last turn.
+_sessions = TTLCache("chat_sessions", CHAT_SESSION_MAX_ENTRIES, CHAT_SESSION_TTL)
+# Keeps summarization tasks referenced until they finish
+_background = set()
+summaries = 0
+
+def get_session(session_id: str, teacher_id: str):
+    """Returns the live session or None if it expired. Raises PermissionError for another teacher's session."""
+    session = _sessions.get(session_id)
+    if session is not None and session["teacher_id"] != teacher_id:
+        raise PermissionError(session_id)
+    return session
+
+def new_session(teacher_id: str, context: str) -> dict:
+    # The context is attached once, so every turn of the session shares the same prompt prefix.
+    session = {
+        "id": str(uuid.uuid4()),
+        "teacher_id": teacher_id,
+        "context": context,
+        "summary": None,
+        "messages": [],
+        "summarizing": False
+    }
+    _sessions.set(session["id"], session)
+    return session
+
+def _messages(session: dict, user_message: str) -> list:
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "system", "content": f"Context:\n{session['context']}"}
+    ]
+    if session["summary"]:
+        messages.append({"role": "system", "content": f"Earlier in this conversation:\n{session['summary']}"})
+    return messages + session["messages"] + [{"role": "user", "content": user_message}]
+
+def _remember(session: dict, user_message: str, reply: str):
+    session["messages"] += [
+        {"role": "user", "content": user_message},
+        {"role": "assistant", "content": reply}
+    ]
+    _sessions.set(session["id"], session)
+
+    history = sum(token_budget.count_tokens(m["content"]) for m in session["messages"])
+    if (history > token_budget.STAGE_BUDGETS["chat_history"]
+            and len(session["messages"]) > RECENT_MESSAGES and not session["summarizing"]):
+        session["summarizing"] = True
+        task = asyncio.create_task(_summarize(session))
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+
+async def _summarize(session: dict):
+    """Folds all but the last RECENT_MESSAGES into the running summary, off the reply path."""
+    global summaries
+    cut = len(session["messages"]) - RECENT_MESSAGES
+    older = session["messages"][:cut]
+
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in older)
+    if session["summary"]:
+        transcript = f"Summary so far: {session['summary']}\n{transcript}"
+
+    try:
+        with rate_limiter.priority(rate_limiter.PRIORITY_BACKGROUND):
+            response = await rate_limiter.run(
+                "groq", CHAT_MODEL,
+                lambda: providers.get("groq").chat.completions.create(model=CHAT_MODEL,
+                                                                      messages=[
+                                                                          {"role": "system", "content": SUMMARY_PROMPT},
+                                                                          {"role": "user", "content": transcript}
+                                                                      ],
+                                                                      max_tokens=SUMMARY_MAX_TOKENS)
+            )
+        token_budget.record_usage("chatbot", response)
+        session["summary"] = response.choices[0].message.content
+        summaries += 1
+    except Exception as e:
+        # Still drop the old turns so the history stays bounded
+        print(f"[CHATBOT] Summarizing session {session['id']} failed: {e}")
+    finally:
+        # Turns are only ever appended, so the first `cut` are still the ones summarized.
+        session["messages"] = session["messages"][cut:]
+        session["summarizing"] = False
+
+async def chat(session: dict, user_message: str) -> str:
+    # Chat replies yield to live submission processing for the shared quota.
+    with rate_limiter.priority(rate_limiter.PRIORITY_BACKGROUND):
+        response = await rate_limiter.run(
+            "groq", CHAT_MODEL,
+            lambda: providers.get("groq").chat.completions.create(model=CHAT_MODEL,
+                                                                  messages=_messages(session, user_message),
+                                                                  max_tokens=MAX_TOKENS)
+        )
+    token_budget.record_usage("chatbot", response)
+
+    reply = response.choices[0].message.content
+    _remember(session, user_message, reply)
+    return reply
+
+async def chat_stream(session: dict, user_message: str):
+    """Yields the reply text as Groq streams it."""
+    with rate_limiter.priority(rate_limiter.PRIORITY_BACKGROUND):
+        stream = await rate_limiter.run(
+            "groq", CHAT_MODEL,
+            lambda: providers.get("groq").chat.completions.create(model=CHAT_MODEL,
+                                                                  messages=_messages(session, user_message),
+                                                                  max_tokens=MAX_TOKENS,
+                                                                  stream=True)
+        )
+
+    # Groq reports usage on the last chunk under x_groq.
+    usage = None
+    parts = []
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            parts.append(chunk.choices[0].delta.content)
+            yield chunk.choices[0].delta.content
+        x_groq = getattr(chunk, "x_groq", None)
+        if getattr(x_groq, "usage", None):
+            usage = x_groq
+    token_budget.record_usage("chatbot", usage)
+
+    _remember(session, user_message, "".join(parts))
+
+def session_stats() -> dict:
+    return dict(_sessions.stats(), summaries=summaries)
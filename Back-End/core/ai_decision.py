@@ -1,12 +1,44 @@
 from pydantic import BaseModel
-import instructor
-from groq import Groq
 from datetime import datetime
-from dotenv import load_dotenv
+from typing import List
+import asyncio
 import os
 import database_function as db
+from utils import providers, token_budget, rate_limiter, status_bus, teacher_context, response_cache
+from core import decision_rules
 
-load_dotenv()
+# "single" decides each submission as its pipeline finishes; "batch" waits
+# for the lecture to close and decides its submissions a few per LLM call.
+DECISION_MODE = os.getenv("DECISION_MODE", "single")
+DECISION_BATCH_SIZE = int(os.getenv("DECISION_BATCH_SIZE", "10"))
+
+# Static instructions go in the system message so every call shares the
+# same prefix; only the submission features change per call.
+SYSTEM_PROMPT = """
+You are an academic evaluation agent. You MUST output ONLY valid JSON.
+
+{
+  "attendance_decision": "PRESENT | ABSENT",
+  "understanding_level": "HIGH | MEDIUM | POOR",
+  "reason": "Concise explanation based on the rules"
+}
+"""
+
+BATCH_SYSTEM_PROMPT = """
+You are an academic evaluation agent. You MUST output ONLY valid JSON.
+Evaluate EACH submission below independently and return one result per SUBMISSION_ID.
+
+{
+  "results": [
+    {
+      "submission_id": "SUBMISSION_ID exactly as given",
+      "attendance_decision": "PRESENT | ABSENT",
+      "understanding_level": "HIGH | MEDIUM | POOR",
+      "reason": "Concise explanation based on the rules"
+    }
+  ]
+}
+"""
 
 
 class EvaluationResult(BaseModel):
@@ -15,48 +47,26 @@ class EvaluationResult(BaseModel):
     reason: str
 
 
-async def ai_decision_and_update_attendance(submission_id: str, supabase) -> dict:
-    submission = db.get_submission_with_ai_results(submission_id).data
+class BatchEvaluationItem(EvaluationResult):
+    submission_id: str
 
-    if submission["status"] != "All done":
-        raise RuntimeError("Submission processing not completed")
 
-    # 2. Prompt
-    prompt = f"""
-You are an academic evaluation agent. You MUST output ONLY valid JSON.
+class BatchEvaluation(BaseModel):
+    results: List[BatchEvaluationItem]
 
-{{
-  "attendance_decision": "PRESENT | ABSENT",
-  "understanding_level": "HIGH | MEDIUM | POOR",
-  "reason": "Concise explanation based on the rules"
-}}
 
-OCR_TEXT: {submission['ocr_text']}
+def _features(submission: dict) -> str:
+    return f"""OCR_TEXT: {token_budget.fit(submission['ocr_text'], "decision")}
 MAX_SIMILARITY: {submission['max_similarity']}
 COPIED_FROM_SUBMISSION_ID: {submission['copied_from_submission_id']}
 AI_SCORE: {submission['ai_score']}
 AI_CONFIDENCE: {submission['ai_confidence']}
 AI_REASON: {submission['ai_reason']}
-CONCEPT: {submission['concept']}
-"""
-
-    # 3. LLM call
-    client = instructor.from_groq(
-        Groq(api_key=os.getenv("GROQ_API_KEY")),
-        mode=instructor.Mode.JSON
-    )
+CONCEPT: {submission['concept']}"""
 
-    result: EvaluationResult = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        response_model=EvaluationResult,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7
-    )
-
-    decision = result.model_dump()
 
-    # 4. Map decision → attendance_registry fields
-    attendance_payload = {
+def _attendance_payload(submission: dict, decision: dict) -> dict:
+    return {
         "user_id": submission["user_id"],
         "lecture_instance_id": submission["lecture_instance_id"],
         "decision": decision["attendance_decision"],
@@ -65,6 +75,148 @@ CONCEPT: {submission['concept']}
         "updated_at": datetime.utcnow().isoformat()
     }
 
-    db.update_attendance_record(submission["user_id"], submission["lecture_instance_id"], attendance_payload)
+
+async def _write_attendance(submission: dict, decision: dict):
+    await asyncio.to_thread(
+        db.update_attendance_record,
+        submission["user_id"],
+        submission["lecture_instance_id"],
+        _attendance_payload(submission, decision)
+    )
+    # /lectures/today shows the student's attendance status.
+    response_cache.invalidate("/lectures/today", submission["user_id"])
+    await asyncio.to_thread(teacher_context.invalidate_lecture, submission["lecture_instance_id"])
+
+
+async def ai_decision_and_update_attendance(submission_id: str, supabase) -> dict:
+    submission = (await asyncio.to_thread(db.get_submission_with_ai_results, submission_id)).data
+
+    if submission["status"] not in ("All done", "decided"):
+        raise RuntimeError("Submission processing not completed")
+
+    # 1. Clear-cut cases are decided locally
+    decision = decision_rules.decide(submission)
+    if decision:
+        await _write_attendance(submission, decision)
+        return decision
+
+    # 2. LLM call
+    result, completion = await rate_limiter.run(
+        "groq", "llama-3.3-70b-versatile",
+        lambda: providers.get("groq_instructor").chat.completions.create_with_completion(
+            model="llama-3.3-70b-versatile",
+            response_model=EvaluationResult,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": _features(submission)}
+            ],
+            temperature=0.7
+        )
+    )
+    token_budget.record_usage("decision", completion)
+
+    decision = result.model_dump()
+
+    # 3. Map decision → attendance_registry fields
+    await _write_attendance(submission, decision)
 
     return decision
+
+
+async def _decide_chunk(submissions: list) -> dict:
+    blocks = "\n\n".join(
+        f"SUBMISSION_ID: {s['id']}\n{_features(s)}" for s in submissions
+    )
+
+    result, completion = await rate_limiter.run(
+        "groq", "llama-3.3-70b-versatile",
+        lambda: providers.get("groq_instructor").chat.completions.create_with_completion(
+            model="llama-3.3-70b-versatile",
+            response_model=BatchEvaluation,
+            messages=[
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": blocks}
+            ],
+            temperature=0.7
+        )
+    )
+    token_budget.record_usage("decision", completion)
+
+    wanted = {s["id"] for s in submissions}
+    return {
+        item.submission_id: item.model_dump(exclude={"submission_id"})
+        for item in result.results
+        if item.submission_id in wanted
+    }
+
+
+async def ai_decision_batch(submission_ids: list) -> dict:
+    """
+    Decides several submissions per LLM call and writes their attendance
+    rows in one bulk_update_attendance call. Submissions missing from a batch response (or
+    in a batch that fails) fall back to the per-submission decision.
+    Returns {submission_id: decision}.
+    """
+    rows = (await asyncio.to_thread(db.get_submissions_with_ai_results, submission_ids)).data or []
+    submissions = [s for s in rows if s["status"] in ("All done", "decided")]
+
+    decisions = {}
+    for s in submissions:
+        decision = decision_rules.decide(s)
+        if decision:
+            decisions[s["id"]] = decision
+
+    escalated = [s for s in submissions if s["id"] not in decisions]
+    chunks = [
+        escalated[i:i + DECISION_BATCH_SIZE]
+        for i in range(0, len(escalated), DECISION_BATCH_SIZE)
+    ]
+
+    for chunk in chunks:
+        try:
+            decisions.update(await _decide_chunk(chunk))
+        except Exception as e:
+            print(f"[AI DECISION] Batch of {len(chunk)} failed, falling back: {e}")
+
+    decided = [s for s in submissions if s["id"] in decisions]
+    if decided:
+        outcomes = (await asyncio.to_thread(
+            db.bulk_update_attendance,
+            [_attendance_payload(s, decisions[s["id"]]) for s in decided]
+        )).data or []
+
+        written = {row["row_index"] for row in outcomes if row["outcome"] == "updated"}
+        for row in outcomes:
+            if row["row_index"] not in written:
+                print(f"[AI DECISION] Attendance not written for {decided[row['row_index']]['id']}: {row['outcome']}")
+        decided = [s for i, s in enumerate(decided) if i in written]
+
+    if decided:
+        await asyncio.to_thread(
+            db.update_submissions_status,
+            [s["id"] for s in decided],
+            "decided"
+        )
+        for s in decided:
+            status_bus.publish_status(s, "decided", decisions[s["id"]])
+        response_cache.invalidate("/lectures/today", *{s["user_id"] for s in decided})
+        for lecture_instance_id in {s["lecture_instance_id"] for s in decided}:
+            await asyncio.to_thread(teacher_context.invalidate_lecture, lecture_instance_id)
+
+    for s in submissions:
+        if s["id"] not in decisions:
+            try:
+                decisions[s["id"]] = await ai_decision_and_update_attendance(s["id"], None)
+                await asyncio.to_thread(db.update_submission, s["id"], {"status": "decided"})
+                status_bus.publish_status(s, "decided", decisions[s["id"]])
+            except Exception as e:
+                print(f"[AI DECISION] Fallback failed for {s['id']}: {e}")
+
+    print(f"[AI DECISION] Batch decided {len(decided)} of {len(submissions)} submissions "
+          f"in {len(chunks)} LLM calls")
+    return decisions
+
+
+async def decide_lecture(lecture_instance_id: str) -> dict:
+    rows = (await asyncio.to_thread(db.get_undecided_submissions, lecture_instance_id)).data or []
+    return await ai_decision_batch([row["id"] for row in rows])
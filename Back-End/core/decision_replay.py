@@ -0,0 +1,130 @@
+# core/decision_replay.py
+"""
+Replays the decision rules over submissions that were already decided by
+the LLM and reports how often the two agree. Run it before tightening or
+loosening any DECISION_RULE_* threshold.
+
+    python -m core.decision_replay --start-date 2025-01-06 --end-date 2025-01-10
+    python -m core.decision_replay --lecture-instance-id <id> --samples 20
+"""
+import argparse
+from collections import Counter
+import database_function as db
+from core import decision_rules
+
+FETCH_CHUNK = 200
+
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def load_history(lecture_instance_id=None, start_date=None, end_date=None) -> list:
+    """
+    Returns (submission, attendance_row) pairs whose decision came from the LLM.
+    Submissions decided before the "decided" status existed were left at
+    "All done", so those count too once their attendance is no longer PENDING.
+    """
+    ids = [row["id"] for row in db.get_submissions_for_reprocess(
+        lecture_instance_id=lecture_instance_id,
+        start_date=start_date,
+        end_date=end_date
+    )]
+
+    pairs = []
+    for chunk in _chunks(ids, FETCH_CHUNK):
+        submissions = [
+            s for s in db.get_submissions_with_ai_results(chunk).data or []
+            if s["status"] in ("decided", "All done")
+        ]
+        if not submissions:
+            continue
+
+        lecture_ids = list({s["lecture_instance_id"] for s in submissions})
+        attendance = {
+            (row["user_id"], row["lecture_instance_id"]): row
+            for row in db.get_attendance_for_lectures(lecture_ids).data or []
+        }
+
+        for s in submissions:
+            row = attendance.get((s["user_id"], s["lecture_instance_id"]))
+            if not row or row.get("decision") in (None, "PENDING"):
+                continue
+            # Rows the rules wrote themselves would trivially agree.
+            if (row.get("reason") or "").startswith(decision_rules.RULE_REASON_PREFIX):
+                continue
+            pairs.append((s, row))
+
+    return pairs
+
+
+def replay(pairs: list) -> dict:
+    confusion = Counter()
+    disagreements = []
+
+    for submission, row in pairs:
+        decision = decision_rules.evaluate(submission)
+        rule = decision["attendance_decision"] if decision else "ESCALATE"
+        confusion[(rule, row["decision"])] += 1
+
+        if decision and rule != row["decision"]:
+            disagreements.append({
+                "submission_id": submission["id"],
+                "rule": decision["reason"],
+                "llm": row["decision"],
+                "llm_reason": row.get("reason")
+            })
+
+    decided = sum(n for (rule, _), n in confusion.items() if rule != "ESCALATE")
+    agreed = sum(n for (rule, llm), n in confusion.items() if rule == llm)
+
+    return {
+        "total": len(pairs),
+        "rule_decided": decided,
+        "agreed": agreed,
+        "agreement": agreed / decided if decided else None,
+        "confusion": confusion,
+        "disagreements": disagreements
+    }
+
+
+def print_report(report: dict, samples: int):
+    total = report["total"]
+    print(f"[DECISION REPLAY] {total} LLM-decided submissions")
+    if not total:
+        return
+
+    print(f"[DECISION REPLAY] Rules would decide {report['rule_decided']} "
+          f"({report['rule_decided'] / total:.0%}), escalating the rest")
+    if report["agreement"] is not None:
+        print(f"[DECISION REPLAY] Agreement with LLM on rule-decided: "
+              f"{report['agreed']}/{report['rule_decided']} ({report['agreement']:.1%})")
+
+    llm_labels = sorted({llm for _, llm in report["confusion"]})
+    print()
+    print("rule \\ llm".ljust(13) + "".join(label.rjust(10) for label in llm_labels))
+    for rule in ("PRESENT", "ABSENT", "ESCALATE"):
+        counts = [report["confusion"].get((rule, llm), 0) for llm in llm_labels]
+        print(rule.ljust(13) + "".join(str(n).rjust(10) for n in counts))
+
+    if report["disagreements"]:
+        print(f"\nSample disagreements ({min(samples, len(report['disagreements']))} "
+              f"of {len(report['disagreements'])}):")
+        for d in report["disagreements"][:samples]:
+            print(f"- {d['submission_id']}: rules {d['rule']} | LLM {d['llm']}: {d['llm_reason']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lecture-instance-id")
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--samples", type=int, default=10)
+    args = parser.parse_args()
+
+    if not (args.lecture_instance_id or (args.start_date and args.end_date)):
+        parser.error("pass --lecture-instance-id or both --start-date and --end-date")
+
+    pairs = load_history(args.lecture_instance_id, args.start_date, args.end_date)
+    print_report(replay(pairs), args.samples)
@@ -0,0 +1,100 @@
+# core/decision_rules.py
+import os
+import re
+
+RULES_ENABLED = os.getenv("DECISION_RULES_ENABLED", "true").lower() == "true"
+# Fewer words than this is treated as an empty / unreadable submission.
+MIN_WORDS = int(os.getenv("DECISION_RULE_MIN_WORDS", "5"))
+# Similarity at or above this against a peer is treated as a copy.
+COPY_SIMILARITY = float(os.getenv("DECISION_RULE_COPY_SIMILARITY", "0.98"))
+# Low AI score + substantive on-concept text is an obvious PRESENT.
+MAX_AI_SCORE = int(os.getenv("DECISION_RULE_MAX_AI_SCORE", "20"))
+MIN_SUBSTANTIVE_WORDS = int(os.getenv("DECISION_RULE_MIN_SUBSTANTIVE_WORDS", "40"))
+MIN_CONCEPT_OVERLAP = float(os.getenv("DECISION_RULE_MIN_CONCEPT_OVERLAP", "0.5"))
+MAX_SIMILARITY_FOR_PRESENT = float(os.getenv("DECISION_RULE_MAX_SIMILARITY_FOR_PRESENT", "0.85"))
+
+RULE_REASON_PREFIX = "[rule:"
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"the", "and", "for", "with", "from", "into", "its", "are", "was", "what", "how", "why"}
+
+stats = {
+    "evaluated": 0,
+    "fast_present": 0,
+    "fast_absent": 0,
+    "escalated": 0
+}
+
+
+def _words(text: str) -> list:
+    return _WORD.findall((text or "").lower())
+
+
+def _concept_overlap(text_words: list, concept: str) -> float:
+    concept_terms = {w for w in _words(concept) if len(w) >= 3 and w not in _STOPWORDS}
+    if not concept_terms:
+        return 0.0
+    return len(concept_terms & set(text_words)) / len(concept_terms)
+
+
+def _decision(attendance: str, understanding: str, rule: str, reason: str) -> dict:
+    return {
+        "attendance_decision": attendance,
+        "understanding_level": understanding,
+        "reason": f"{RULE_REASON_PREFIX}{rule}] {reason}"
+    }
+
+
+def evaluate(submission: dict):
+    """Returns a decision for clear-cut submissions, or None to escalate to the LLM."""
+    words = _words(submission.get("ocr_text"))
+    similarity = submission.get("max_similarity")
+    ai_score = submission.get("ai_score")
+
+    if len(words) < MIN_WORDS:
+        return _decision("ABSENT", "POOR", "empty_text",
+                         f"Submission has {len(words)} readable words.")
+
+    if similarity is not None and similarity >= COPY_SIMILARITY:
+        return _decision("ABSENT", "POOR", "copied",
+                         f"Similarity {similarity:.2f} with submission "
+                         f"{submission.get('copied_from_submission_id')}.")
+
+    # A failed AI check stores ai_score 0 with no confidence, and a missing
+    # similarity means no copy check ran (no embedding or no peers yet).
+    # Neither is evidence for PRESENT, so those go to the LLM.
+    ai_checked = (submission.get("ai_confidence") is not None
+                  and submission.get("ai_reason") != "Detection failed")
+    overlap = _concept_overlap(words, submission.get("concept"))
+    if (ai_checked and ai_score is not None and ai_score <= MAX_AI_SCORE
+            and len(words) >= MIN_SUBSTANTIVE_WORDS
+            and overlap >= MIN_CONCEPT_OVERLAP
+            and similarity is not None and similarity < MAX_SIMILARITY_FOR_PRESENT):
+        return _decision("PRESENT", "MEDIUM", "substantive_on_concept",
+                         f"{len(words)} words, AI score {ai_score}, "
+                         f"{overlap:.0%} of concept terms covered.")
+
+    return None
+
+
+def decide(submission: dict):
+    """evaluate() plus counters; a no-op when the rule engine is disabled."""
+    if not RULES_ENABLED:
+        return None
+
+    stats["evaluated"] += 1
+    decision = evaluate(submission)
+
+    if decision is None:
+        stats["escalated"] += 1
+        return None
+
+    key = "fast_present" if decision["attendance_decision"] == "PRESENT" else "fast_absent"
+    stats[key] += 1
+    print(f"[DECISION RULES] {submission.get('id')}: {decision['reason']} "
+          f"(LLM calls saved: {stats['fast_present'] + stats['fast_absent']})")
+    return decision
+
+
+def stats_snapshot() -> dict:
+    return dict(stats, llm_calls_saved=stats["fast_present"] + stats["fast_absent"])
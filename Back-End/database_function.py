@@ -32,6 +32,12 @@ def get_student_attendance_overview(user_id: str, start_date: str, end_date: str
         }
     ).execute()
 
+def get_student_class_summary(user_id: str):
+    return supabase.table("student_class_attendance") \
+        .select("present_count, absent_count, od_count, total_count, classes(class_code, class_name)") \
+        .eq("user_id", user_id) \
+        .execute()
+
 def resolve_lecture_instance(user_id: str, date: str, subject_code: str, slot_start: str, slot_end: str):
     return supabase.rpc(
         "resolve_lecture_instance",
@@ -155,11 +161,23 @@ def update_attendance_record(user_id: str, lecture_instance_id: str, update_data
         .eq("lecture_instance_id", lecture_instance_id) \
         .execute()
 
-def update_attendance_bulk(lecture_instance_id: str, user_ids: list, update_data: dict):
+def get_attendance_for_lectures(lecture_instance_ids: list):
     return supabase.table("attendance_registry") \
-        .update(update_data) \
-        .eq("lecture_instance_id", lecture_instance_id) \
-        .in_("user_id", user_ids) \
+        .select("user_id, lecture_instance_id, decision, conceptual_understanding, reason") \
+        .in_("lecture_instance_id", lecture_instance_ids) \
+        .execute()
+
+# rows: [{user_id or username, lecture_instance_id, decision, reason?, conceptual_understanding?}]
+def bulk_update_attendance(rows: list):
+    return supabase.rpc(
+        "bulk_update_attendance",
+        {"p_rows": rows}
+    ).execute()
+
+def get_lecture_teachers(lecture_instance_ids: list):
+    return supabase.table("lecture_instances") \
+        .select("id, timetable_lectures!inner(teacher_id)") \
+        .in_("id", lecture_instance_ids) \
         .execute()
 
 # --- Submission Functions ---
@@ -171,6 +189,19 @@ def get_submission(submission_id: str):
         .single() \
         .execute()
 
+def get_submission_status(submission_id: str):
+    return supabase.table("submissions") \
+        .select("id, user_id, lecture_instance_id, status, ai_status, uploaded_at") \
+        .eq("id", submission_id) \
+        .execute()
+
+def get_lecture_submission_statuses(lecture_instance_id: str):
+    return supabase.table("submissions") \
+        .select("id, user_id, status, ai_status, uploaded_at") \
+        .eq("lecture_instance_id", lecture_instance_id) \
+        .order("uploaded_at") \
+        .execute()
+
 def get_existing_submission(user_id: str, lecture_instance_id: str):
     return supabase.table("submissions") \
         .select("id") \
@@ -181,12 +212,104 @@ def get_existing_submission(user_id: str, lecture_instance_id: str):
 def create_submission(data: dict):
     return supabase.table("submissions").insert(data).execute()
 
+def validate_and_create_submission(user_id: str, lecture_instance_id: str, image_url: str, uploaded_at: str):
+    return supabase.rpc(
+        "validate_and_create_submission",
+        {
+            "p_user_id": user_id,
+            "p_lecture_instance_id": lecture_instance_id,
+            "p_image_url": image_url,
+            "p_uploaded_at": uploaded_at
+        }
+    ).execute()
+
 def update_submission(submission_id: str, update_data: dict):
     return supabase.table("submissions") \
         .update(update_data) \
         .eq("id", submission_id) \
         .execute()
 
+def delete_submission(submission_id: str):
+    return supabase.table("submissions") \
+        .delete() \
+        .eq("id", submission_id) \
+        .execute()
+
+def claim_resumable_submissions(statuses: list, since: str, lease_seconds: int):
+    return supabase.rpc(
+        "claim_resumable_submissions",
+        {
+            "p_statuses": statuses,
+            "p_since": since,
+            "p_lease_seconds": lease_seconds
+        }
+    ).execute()
+
+# Only rows uploaded before this one (id breaks ties), so the original is never flagged as the copy.
+def find_submission_by_image_hash(lecture_instance_id: str, image_hash: str, submission_id: str, uploaded_at: str):
+    return supabase.table("submissions") \
+        .select("id") \
+        .eq("lecture_instance_id", lecture_instance_id) \
+        .eq("image_hash", image_hash) \
+        .or_(f'uploaded_at.lt."{uploaded_at}",and(uploaded_at.eq."{uploaded_at}",id.lt.{submission_id})') \
+        .order("uploaded_at") \
+        .order("id") \
+        .limit(1) \
+        .execute()
+
+def get_lecture_embeddings(lecture_instance_id: str):
+    return supabase.table("submissions") \
+        .select("id, embedding") \
+        .eq("lecture_instance_id", lecture_instance_id) \
+        .not_.is_("embedding", "null") \
+        .execute()
+
+def get_submissions_needing_embedding(model: str, after_id: str, limit: int):
+    query = supabase.table("submissions") \
+        .select("id, ocr_text") \
+        .not_.is_("ocr_text", "null") \
+        .or_(f'embedding.is.null,embedding_model.is.null,embedding_model.neq."{model}"') \
+        .order("id") \
+        .limit(limit)
+
+    if after_id:
+        query = query.gt("id", after_id)
+
+    return query.execute()
+
+def bulk_update_embeddings(rows: list):
+    return supabase.table("submissions") \
+        .upsert(rows, on_conflict="id") \
+        .execute()
+
+# PostgREST caps a response at 1000 rows, so this pages until a short page comes back.
+REPROCESS_PAGE_SIZE = 1000
+
+def get_submissions_for_reprocess(lecture_instance_id: str = None, start_date: str = None,
+                                  end_date: str = None, teacher_id: str = None):
+    rows = []
+    while True:
+        # id breaks uploaded_at ties so pages don't overlap or skip rows
+        query = supabase.table("submissions") \
+            .select("id, lecture_instances!inner(lecture_date, timetable_lectures!inner(teacher_id))") \
+            .order("uploaded_at") \
+            .order("id") \
+            .range(len(rows), len(rows) + REPROCESS_PAGE_SIZE - 1)
+
+        if lecture_instance_id:
+            query = query.eq("lecture_instance_id", lecture_instance_id)
+        if start_date:
+            query = query.gte("lecture_instances.lecture_date", start_date)
+        if end_date:
+            query = query.lte("lecture_instances.lecture_date", end_date)
+        if teacher_id:
+            query = query.eq("lecture_instances.timetable_lectures.teacher_id", teacher_id)
+
+        page = query.execute().data or []
+        rows += page
+        if len(page) < REPROCESS_PAGE_SIZE:
+            return rows
+
 def get_submission_with_ai_results(submission_id: str):
     return supabase.table("submissions") \
         .select("id, user_id, lecture_instance_id, ocr_text, max_similarity, copied_from_submission_id, ai_score, ai_confidence, ai_reason, status, concept") \
@@ -194,6 +317,25 @@ def get_submission_with_ai_results(submission_id: str):
         .single() \
         .execute()
 
+def get_submissions_with_ai_results(submission_ids: list):
+    return supabase.table("submissions") \
+        .select("id, user_id, lecture_instance_id, ocr_text, max_similarity, copied_from_submission_id, ai_score, ai_confidence, ai_reason, status, concept") \
+        .in_("id", submission_ids) \
+        .execute()
+
+def get_undecided_submissions(lecture_instance_id: str):
+    return supabase.table("submissions") \
+        .select("id") \
+        .eq("lecture_instance_id", lecture_instance_id) \
+        .eq("status", "All done") \
+        .execute()
+
+def update_submissions_status(submission_ids: list, status: str):
+    return supabase.table("submissions") \
+        .update({"status": status}) \
+        .in_("id", submission_ids) \
+        .execute()
+
 def find_max_similarity(submission_id: str):
     return supabase.rpc(
         "find_max_similarity_for_submission",
@@ -1,36 +1,72 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends, Header, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from supabase_client import supabase as supabase_client_obj
 from supabase import create_client
 from zoneinfo import ZoneInfo
 from pydantic import BaseModel
 from typing import List
-from processors.submission_processor import process_submission
+from processors import job_queue, reprocess
+from core import ai_decision, decision_rules
+from utils import providers, image_preprocess, vector_index, result_cache, token_budget, ocr_engine, rate_limiter
+from utils.ttl_cache import TTLCache
+from utils import response_cache, status_bus, teacher_context
 import database_function as db
 import uuid
+import asyncio
+import json
 from datetime import datetime, date, time, timedelta
-from collections import defaultdict
 import os
 import jwt
 from dotenv import load_dotenv
-from chatbot import chat    
+import chatbot
 
 load_dotenv()
 
 SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", "300"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+STATUS_STREAM_HEARTBEAT = float(os.getenv("STATUS_STREAM_HEARTBEAT", "15"))
+
+token_cache = TTLCache("tokens", AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL)
+role_cache = TTLCache("roles", AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL)
 
 app = FastAPI()
 
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:5173,http://localhost:3000").split(",")
 
+# Polled dashboard reads (seconds). Added before CORS so 304s get CORS headers.
+app.add_middleware(
+    response_cache.ResponseCacheMiddleware,
+    ttls={
+        "/classes": 300,
+        "/teacher/classes": 300,
+        "/lectures/today": 30,
+        "/teacher/lectures/today": 30,
+        "/student/submissions": 60,
+    }
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Chat-Session"],
 )
 
+@app.on_event("startup")
+async def startup():
+    await providers.startup()
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await job_queue.stop()
+    await providers.shutdown()
+    image_preprocess.shutdown()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -42,6 +78,9 @@ supabase_admin = create_client(
 
 BUCKET_NAME = "submission"
 
+# Keeps fire-and-forget tasks referenced until they finish
+background_tasks = set()
+
 HOUR_SLOTS = [
     (time(8, 45), time(9, 35)),   # 1
     (time(9, 40), time(10, 30)),  # 2
@@ -56,13 +95,8 @@ def get_hour_slot(start_time: time):
             return str(i)
     return None
 
-def verify_token(authorization: str = Header(...)):
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
-    
+def _verify_token_uncached(token: str):
     try:
-        token = authorization.split(" ")[1]
-        
         # If JWT secret is configured, use it for verification 
         if SUPABASE_JWT_SECRET:
             try:
@@ -109,85 +143,246 @@ def verify_token(authorization: str = Header(...)):
         raise HTTPException(status_code=401, detail=f"Token verification failed: {str(e)}")
 
 
-def require_student(user=Depends(verify_token)):
-    profile = db.get_user_role(user["sub"])
+def verify_token(authorization: str = Header(...)):
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
+
+    token = authorization.split(" ")[1]
+
+    # Cached entries never outlive the token's own expiry
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.InvalidTokenError:
+        exp = None
+
+    ttl = AUTH_CACHE_TTL
+    if exp:
+        ttl = min(ttl, exp - datetime.now().timestamp())
+        if ttl <= 0:
+            raise HTTPException(status_code=401, detail="Token has expired")
+
+    return token_cache.get_or_load(token, lambda: _verify_token_uncached(token), ttl=ttl)
 
-    if not profile.data or profile.data["role"] != "student":
+
+def get_cached_role(user_id: str):
+    def load():
+        profile = db.get_user_role(user_id)
+        return profile.data["role"] if profile.data else None
+
+    return role_cache.get_or_load(user_id, load)
+
+
+def require_student(user=Depends(verify_token)):
+    if get_cached_role(user["sub"]) != "student":
         raise HTTPException(status_code=403, detail="Students only")
 
     return user
 
 
 def require_teacher(user=Depends(verify_token)):
-    profile = db.get_user_role(user["sub"])
-
-    if not profile.data or profile.data["role"] != "teacher":
+    if get_cached_role(user["sub"]) != "teacher":
         raise HTTPException(status_code=403, detail="Teachers only")
 
     return user
     
+# validate_and_create_submission error codes -> HTTP responses
+UPLOAD_ERRORS = {
+    "LECTURE_NOT_FOUND": (404, "Lecture not found"),
+    "LECTURE_NOT_ACCEPTING": (403, "Lecture is not accepting submissions"),
+    "NOT_ENROLLED": (403, "You are not enrolled for this lecture"),
+    "MARKED_ABSENT": (403, "You are marked absent for this lecture"),
+    "DUPLICATE_SUBMISSION": (409, "Submission already exists"),
+}
+
 @app.post("/upload")
 async def upload_submission(
     user_id: str = Form(...),
     lecture_instance_id: str = Form(...),
     file: UploadFile = File(...)
 ):
-    lecture = db.get_lecture_instance(lecture_instance_id)
+    file_ext = file.filename.split(".")[-1]
+    file_name = f"{uuid.uuid4()}.{file_ext}"
+    file_bytes = await file.read()
 
-    if not lecture.data:
-        raise HTTPException(404, "Lecture not found")
+    # Only builds the URL; nothing is stored until the checks pass.
+    public_url = supabase_client_obj.storage.from_(BUCKET_NAME).get_public_url(file_name)
 
-    if lecture.data["attendance_locked"] or lecture.data["status"] != "live":
-        raise HTTPException(403, "Lecture is not accepting submissions")
+    # Lecture state, enrollment, ABSENT and duplicate checks, the submission
+    # insert and the PENDING update all run in one transaction.
+    result = (await asyncio.to_thread(
+        db.validate_and_create_submission,
+        user_id, lecture_instance_id, public_url, datetime.now().isoformat()
+    )).data[0]
 
-    attendance = supabase_client_obj.table("attendance_registry").select("decision").eq("user_id", user_id).eq("lecture_instance_id", lecture_instance_id).single().execute()
+    if result["error_code"]:
+        status_code, detail = UPLOAD_ERRORS.get(result["error_code"], (400, result["error_code"]))
+        raise HTTPException(status_code, detail)
 
-    if not attendance.data:
-        raise HTTPException(403, "You are not enrolled for this lecture")
+    submission_id = result["submission_id"]
 
-    if attendance.data["decision"] == "ABSENT":
-        raise HTTPException(403, "You are marked absent for this lecture")
+    try:
+        upload_res = await asyncio.to_thread(
+            supabase_client_obj.storage.from_(BUCKET_NAME).upload,
+            file_name, file_bytes
+        )
+        uploaded = "error" not in str(upload_res).lower()
+    except Exception as e:
+        print(f"[UPLOAD] Storage upload failed for {submission_id}: {e}")
+        uploaded = False
+
+    if not uploaded:
+        # Don't leave a submission pointing at a missing image; the student can retry.
+        try:
+            await asyncio.to_thread(db.delete_submission, submission_id)
+        except Exception as e:
+            print(f"[UPLOAD] Could not remove submission {submission_id}: {e}")
+        raise HTTPException(500, "File upload failed")
 
-    existing = db.get_existing_submission(user_id, lecture_instance_id)
+    submission_id = result["submission_id"]
+    status_bus.publish_status({
+        "id": submission_id,
+        "user_id": user_id,
+        "lecture_instance_id": lecture_instance_id
+    }, "pending")
 
-    if existing.data:
-        raise HTTPException(409, "Submission already exists")
+    job_queue.enqueue(submission_id, image_bytes=file_bytes)
 
-    file_ext = file.filename.split(".")[-1]
-    file_name = f"{uuid.uuid4()}.{file_ext}"
-    file_bytes = await file.read()
+    response_cache.invalidate("/student/submissions", user_id)
+    response_cache.invalidate("/lectures/today", user_id)
+
+    return {
+        "status": "success",
+        "submission_id": submission_id,
+        "image_url": public_url
+    }
+
+async def _submission_snapshot(submission_id: str):
+    rows = (await asyncio.to_thread(db.get_submission_status, submission_id)).data
+
+    if not rows:
+        return None
+
+    submission = rows[0]
+    decision = None
 
-    upload_res = supabase_client_obj.storage.from_("submission").upload(
-        file_name, file_bytes
+    if submission["status"] == "decided":
+        attendance = await asyncio.to_thread(
+            db.get_attendance_record, submission["user_id"], submission["lecture_instance_id"]
+        )
+        if attendance.data:
+            decision = {"attendance_decision": attendance.data["decision"]}
+
+    return {
+        "submission_id": submission["id"],
+        "lecture_instance_id": submission["lecture_instance_id"],
+        "user_id": submission["user_id"],
+        "status": submission["status"],
+        "ai_status": submission["ai_status"],
+        "uploaded_at": submission["uploaded_at"],
+        "decision": decision
+    }
+
+def _sse(data: dict, event: str = "status") -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def _status_stream(channel: str, snapshot, done=lambda event: False):
+    # Subscribe before reading the snapshot so no transition falls between them.
+    with status_bus.subscribe(channel) as queue:
+        current = await snapshot()
+        yield _sse(current, "snapshot")
+
+        if done(current):
+            return
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), STATUS_STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+
+            yield _sse(event)
+
+            if done(event):
+                return
+
+def _event_stream_response(stream):
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
-    if "error" in str(upload_res).lower():
-        raise HTTPException(500, "File upload failed")
+@app.get("/submissions/{submission_id}")
+async def get_submission_status(submission_id: str, user=Depends(verify_token)):
+    snapshot = await _submission_snapshot(submission_id)
 
-    public_url = supabase_client_obj.storage.from_("submission").get_public_url(file_name)
+    if not snapshot:
+        raise HTTPException(404, "Submission not found")
 
-    record = db.create_submission({
-        "user_id": user_id,
-        "lecture_instance_id": lecture_instance_id,
-        "uploaded_at": datetime.now().isoformat(),
-        "image_url": public_url,
-        "status": "pending"
-    })
+    if snapshot["user_id"] != user["sub"] and await asyncio.to_thread(get_cached_role, user["sub"]) != "teacher":
+        raise HTTPException(403, "Not authorized")
 
-    submission_id = record.data[0]["id"]
+    return snapshot
 
-    db.update_attendance_record(user_id, lecture_instance_id, {
-        "decision": "PENDING",
-        "updated_at": "now()"
-    })
-    submission_id = record.data[0]["id"]
+# EventSource cannot send an Authorization header, so the streams take the
+# caller's id as a query parameter like the other dashboard reads.
+@app.get("/submissions/{submission_id}/events")
+async def submission_events(submission_id: str, user_id: str):
+    snapshot = await _submission_snapshot(submission_id)
+
+    if not snapshot:
+        raise HTTPException(404, "Submission not found")
+
+    if snapshot["user_id"] != user_id:
+        raise HTTPException(403, "Not authorized")
+
+    return _event_stream_response(_status_stream(
+        status_bus.submission_channel(submission_id),
+        lambda: _submission_snapshot(submission_id),
+        done=lambda event: event["status"] == "decided"
+    ))
+
+@app.get("/teacher/lectures/{lecture_instance_id}/events")
+async def lecture_events(lecture_instance_id: str, teacher_id: str):
+    lecture = await asyncio.to_thread(db.get_lecture_instance, lecture_instance_id)
+
+    if not lecture.data:
+        raise HTTPException(404, "Lecture not found")
+
+    if lecture.data["timetable_lectures"]["teacher_id"] != teacher_id:
+        raise HTTPException(403, "Not authorized")
+
+    async def snapshot():
+        rows = await asyncio.to_thread(db.get_lecture_submission_statuses, lecture_instance_id)
+        return {
+            "lecture_instance_id": lecture_instance_id,
+            "submissions": rows.data or []
+        }
 
-    await process_submission(submission_id)
+    return _event_stream_response(_status_stream(
+        status_bus.lecture_channel(lecture_instance_id),
+        snapshot
+    ))
 
+@app.get("/metrics")
+def metrics():
     return {
-        "status": "success",
-        "submission_id": submission_id,
-        "image_url": public_url
+        "auth": {
+            "tokens": token_cache.stats(),
+            "roles": role_cache.stats()
+        },
+        "result_cache": result_cache.stats(),
+        "vector_index": vector_index.stats(),
+        "decision_rules": decision_rules.stats_snapshot(),
+        "token_usage": token_budget.stats(),
+        "ocr_router": ocr_engine.ocr_router.stats(),
+        "rate_limits": rate_limiter.stats(),
+        "response_cache": response_cache.stats(),
+        "status_streams": status_bus.stats(),
+        "teacher_context": teacher_context.stats(),
+        "chat_sessions": chatbot.session_stats()
     }
 
 @app.get("/test-supabase")
@@ -226,6 +421,7 @@ async def register(
     })
 
     db.create_user_profile(auth_user.user.id, username, role)
+    role_cache.invalidate(auth_user.user.id)
 
     return {
         "status": "created",
@@ -262,6 +458,8 @@ async def login(
     if not profile.data:
         raise HTTPException(status_code=403, detail="Profile not found")
 
+    role_cache.set(user_id, profile.data["role"])
+
     if profile.data["role"] != user_type:
         raise HTTPException(status_code=403, detail="Role mismatch")
 
@@ -308,15 +506,15 @@ async def attendance_student_overview(
     start_date: str,
     end_date: str
 ):
-    rows = db.get_student_attendance_overview(user_id, start_date, end_date).data
+    # Calendar comes from the raw rows in the window; the subject summary is
+    # read from the trigger-maintained per-class totals.
+    overview, class_summary = await asyncio.gather(
+        asyncio.to_thread(db.get_student_attendance_overview, user_id, start_date, end_date),
+        asyncio.to_thread(db.get_student_class_summary, user_id)
+    )
+    rows = overview.data
 
     calendar_map = {}
-    summary_map = defaultdict(lambda: {
-        "present": 0,
-        "absent": 0,
-        "od": 0,
-        "total": 0
-    })
 
     for row in rows:
         date_str = row["lecture_date"]
@@ -343,28 +541,21 @@ async def attendance_student_overview(
             "status": row["decision"]
         }
 
-        s = summary_map[subject_label]
-        s["total"] += 1
-
-        if row["decision"] == "PRESENT":
-            s["present"] += 1
-        elif row["decision"] == "ABSENT":
-            s["absent"] += 1
-        elif row["decision"] == "OD":
-            s["od"] += 1
-
     summary = []
-    for subject, s in summary_map.items():
+    for s in sorted(class_summary.data or [], key=lambda s: s["classes"]["class_code"]):
+        if not s["total_count"]:
+            continue
+
         percentage = round(
-            ((s["present"] + s["od"]) / s["total"]) * 100
-        ) if s["total"] else 0
+            ((s["present_count"] + s["od_count"]) / s["total_count"]) * 100
+        )
 
         summary.append({
-            "subject": subject,
-            "present": s["present"],
-            "absent": s["absent"],
-            "od": s["od"],
-            "total": s["total"],
+            "subject": f'{s["classes"]["class_code"]} - {s["classes"]["class_name"]}',
+            "present": s["present_count"],
+            "absent": s["absent_count"],
+            "od": s["od_count"],
+            "total": s["total_count"],
             "percentage": percentage
         })
 
@@ -494,6 +685,8 @@ async def create_attendance_appeal(
             )
         raise e
 
+    await asyncio.to_thread(teacher_context.invalidate_lecture, lecture_instance_id)
+
     return {
         "status": "success",
         "message": "Appeal submitted successfully",
@@ -550,6 +743,19 @@ async def control_lecture(
 
     db.update_lecture_instance(lecture_instance_id, update_data)
 
+    # Every enrolled student's "today" view shows the lecture status.
+    response_cache.invalidate("/teacher/lectures/today", teacher_id)
+    response_cache.invalidate("/lectures/today")
+    teacher_context.invalidate(teacher_id)
+
+    if action == "CLOSE":
+        vector_index.evict(lecture_instance_id)
+
+        if ai_decision.DECISION_MODE == "batch":
+            task = asyncio.create_task(ai_decision.decide_lecture(lecture_instance_id))
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
+
     return {
         "status": "success",
         "lecture_instance_id": lecture_instance_id,
@@ -557,13 +763,56 @@ async def control_lecture(
         "concept": concept or ""
     }
 
+@app.post("/teacher/reprocess")
+async def reprocess_submissions(
+    teacher_id: str,
+    lecture_instance_id: str | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    redo: str | None = None
+):
+    if not lecture_instance_id and not (start_date and end_date):
+        raise HTTPException(400, "Pass lecture_instance_id or start_date and end_date")
+
+    try:
+        redo_stages = reprocess.parse_redo(redo)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    if lecture_instance_id:
+        lecture = db.get_lecture_instance(lecture_instance_id)
+
+        if not lecture.data:
+            raise HTTPException(404, "Lecture not found")
+
+        if lecture.data["timetable_lectures"]["teacher_id"] != teacher_id:
+            raise HTTPException(403, "Not authorized")
+
+    submission_ids = await asyncio.to_thread(
+        reprocess.find_submission_ids,
+        lecture_instance_id=lecture_instance_id,
+        start_date=start_date,
+        end_date=end_date,
+        teacher_id=teacher_id
+    )
+
+    async def progress_stream():
+        yield json.dumps({"total": len(submission_ids)}) + "\n"
+        async for progress in reprocess.reprocess_submissions(submission_ids, redo=redo_stages):
+            yield json.dumps(progress) + "\n"
+
+    return StreamingResponse(progress_stream(), media_type="application/x-ndjson")
+
 @app.get("/attendance/teacher/overview")
 async def teacher_attendance_overview(
     teacher_id: str,
     start_date: str,
     end_date: str
 ):
-    result = db.get_teacher_attendance_overview(teacher_id, start_date, end_date)
+    # Counts come pre-aggregated from lecture_attendance_rollup.
+    result = await asyncio.to_thread(
+        db.get_teacher_attendance_overview, teacher_id, start_date, end_date
+    )
 
     lectures = []
 
@@ -673,6 +922,9 @@ async def resolve_appeal(
         db.update_attendance_record(appeal.data["user_id"], appeal.data["lecture_instance_id"], {
             "decision": "PRESENT"
         })
+        response_cache.invalidate("/lectures/today", appeal.data["user_id"])
+
+    teacher_context.invalidate(teacher_id)
 
     return {"status": "success", "decision": decision}
 
@@ -704,6 +956,62 @@ class MarkAbsentRequest(BaseModel):
     lecture_instance_id: str
     students_username: List[str]
 
+class AttendanceRow(BaseModel):
+    lecture_instance_id: str
+    user_id: str | None = None
+    username: str | None = None
+    decision: str
+    reason: str | None = None
+    conceptual_understanding: str | None = None
+
+class BulkAttendanceRequest(BaseModel):
+    rows: List[AttendanceRow]
+
+async def _apply_attendance_rows(rows: list) -> list:
+    try:
+        outcomes = (await asyncio.to_thread(db.bulk_update_attendance, rows)).data or []
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    updated = [row for row in outcomes if row["outcome"] == "updated"]
+    if updated:
+        response_cache.invalidate("/lectures/today", *{row["user_id"] for row in updated})
+        for lecture_instance_id in {row["lecture_instance_id"] for row in updated}:
+            await asyncio.to_thread(teacher_context.invalidate_lecture, lecture_instance_id)
+
+    return outcomes
+
+@app.post("/teacher/attendance/bulk")
+async def bulk_update_attendance(teacher_id: str, payload: BulkAttendanceRequest):
+    if not payload.rows:
+        raise HTTPException(status_code=400, detail="rows cannot be empty")
+
+    if any(not row.user_id and not row.username for row in payload.rows):
+        raise HTTPException(status_code=400, detail="Each row needs a user_id or a username")
+
+    lecture_ids = list({row.lecture_instance_id for row in payload.rows})
+    lectures = (await asyncio.to_thread(db.get_lecture_teachers, lecture_ids)).data or []
+
+    if len(lectures) != len(lecture_ids):
+        raise HTTPException(404, "Lecture not found")
+
+    if any(l["timetable_lectures"]["teacher_id"] != teacher_id for l in lectures):
+        raise HTTPException(403, "Not authorized")
+
+    outcomes = await _apply_attendance_rows(
+        [row.model_dump(exclude_none=True) for row in payload.rows]
+    )
+
+    counts = {}
+    for row in outcomes:
+        counts[row["outcome"]] = counts.get(row["outcome"], 0) + 1
+
+    return {
+        "success": True,
+        "counts": counts,
+        "results": outcomes
+    }
+
 @app.post("/teacher/attendance/mark-absent")
 async def mark_students_absent(payload: MarkAbsentRequest):
     if not payload.students_username:
@@ -712,56 +1020,83 @@ async def mark_students_absent(payload: MarkAbsentRequest):
             detail="students_username cannot be empty"
         )
 
-    try:
-        profiles_res = db.get_profiles_by_usernames(payload.students_username)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Usernames are resolved inside the same statement as the update
+    outcomes = await _apply_attendance_rows([
+        {
+            "username": username,
+            "lecture_instance_id": payload.lecture_instance_id,
+            "decision": "ABSENT"
+        }
+        for username in payload.students_username
+    ])
+
+    by_outcome = {}
+    for row in outcomes:
+        by_outcome.setdefault(row["outcome"], []).append(row["username"])
 
-    if not profiles_res.data:
+    if len(by_outcome.get("unknown_user", [])) == len(outcomes):
         raise HTTPException(
             status_code=404,
             detail="No matching students found"
         )
 
-    username_to_id = {p["username"]: p["id"] for p in profiles_res.data}
-    user_ids = list(username_to_id.values())
-
-    try:
-        attendance_res = db.update_attendance_bulk(payload.lecture_instance_id, user_ids, {
-            "decision": "ABSENT",
-            "updated_at": datetime.utcnow().isoformat()
-        })
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-    not_found_usernames = list(
-        set(payload.students_username) - set(username_to_id.keys())
-    )
-
     return {
         "success": True,
         "lecture_instance_id": payload.lecture_instance_id,
-        "marked_absent": list(username_to_id.keys()),
-        "usernames_not_found": not_found_usernames,
-        "updated_rows": len(attendance_res.data)
+        "marked_absent": by_outcome.get("updated", []),
+        "usernames_not_found": by_outcome.get("unknown_user", []),
+        "usernames_not_enrolled": by_outcome.get("not_enrolled", []),
+        "updated_rows": len(by_outcome.get("updated", []))
     }
 
+async def _teacher_chat_context(teacher_id: str) -> str:
+    try:
+        return await asyncio.to_thread(teacher_context.get, teacher_id)
+    except LookupError:
+        raise HTTPException(500, "Context fetch failed")
+
+async def _chat_session(teacher_id: str, session_id: str | None) -> dict:
+    # An expired or unknown session id starts a new session; clients keep
+    # whichever id comes back.
+    try:
+        session = chatbot.get_session(session_id, teacher_id) if session_id else None
+    except PermissionError:
+        raise HTTPException(403, "Not authorized")
+
+    if session is None:
+        session = chatbot.new_session(teacher_id, await _teacher_chat_context(teacher_id))
+
+    return session
+
 @app.post("/teacher/chat")
 async def teacher_chat(
     teacher_id: str,
-    message: str
+    message: str,
+    session_id: str | None = None
 ):
-    ctx = db.get_teacher_context(teacher_id)
-
-    if not ctx.data:
-        raise HTTPException(500, "Context fetch failed")
+    session = await _chat_session(teacher_id, session_id)
 
-    teacher_context = dict(ctx.data)
-
-    response = await chat(
-        teacher_context,
+    response = await chatbot.chat(
+        session,
         message
     )
 
-    return {"reply": response}
+    return {"reply": response, "session_id": session["id"]}
 
+@app.post("/teacher/chat/stream")
+async def teacher_chat_stream(
+    teacher_id: str,
+    message: str,
+    session_id: str | None = None
+):
+    session = await _chat_session(teacher_id, session_id)
+
+    return StreamingResponse(
+        chatbot.chat_stream(session, message),
+        media_type="text/plain; charset=utf-8",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Chat-Session": session["id"]
+        }
+    )
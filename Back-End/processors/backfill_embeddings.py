@@ -0,0 +1,91 @@
+# processors/backfill_embeddings.py
+"""
+Re-embeds submissions whose embedding is missing or was produced by a
+different model than EMBED_MODEL.
+
+    python -m processors.backfill_embeddings --page-size 200 --state-file backfill.state
+
+Progress is saved to --state-file after every page, so an interrupted run
+picks up from the last written submission id. Point EMBED_BASE_URL at a
+local stub server to dry-run against test data.
+"""
+import argparse
+import asyncio
+import os
+import time
+import database_function as db
+from utils import providers
+from utils.embed_engine import embed_texts, EMBED_MODEL
+
+
+def _read_state(path):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return f.read().strip() or None
+    return None
+
+
+def _write_state(path, last_id):
+    if path:
+        with open(path, "w") as f:
+            f.write(last_id)
+
+
+async def backfill(page_size: int, batch_size: int, concurrency: int,
+                   state_file: str = None, limit: int = None):
+    after_id = _read_state(state_file)
+    if after_id:
+        print(f"[BACKFILL] Resuming after submission {after_id}")
+
+    done = 0
+    started = time.perf_counter()
+
+    while limit is None or done < limit:
+        rows = (await asyncio.to_thread(
+            db.get_submissions_needing_embedding, EMBED_MODEL, after_id, page_size
+        )).data
+
+        if not rows:
+            break
+
+        texts = [(row["id"], row["ocr_text"]) for row in rows if row["ocr_text"].strip()]
+        vectors = await embed_texts(
+            [text for _, text in texts],
+            batch_size=batch_size,
+            concurrency=concurrency
+        )
+
+        updates = [
+            {"id": submission_id, "embedding": vector, "embedding_model": EMBED_MODEL}
+            for (submission_id, _), vector in zip(texts, vectors)
+        ]
+        if updates:
+            await asyncio.to_thread(db.bulk_update_embeddings, updates)
+
+        after_id = rows[-1]["id"]
+        _write_state(state_file, after_id)
+
+        done += len(updates)
+        elapsed = time.perf_counter() - started
+        print(f"[BACKFILL] {done} rows embedded, {done / elapsed:.1f} rows/sec, last id {after_id}")
+
+    await providers.shutdown()
+    print(f"[BACKFILL] Finished: {done} rows in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--state-file")
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args()
+
+    asyncio.run(backfill(
+        args.page_size,
+        args.batch_size,
+        args.concurrency,
+        state_file=args.state_file,
+        limit=args.limit
+    ))
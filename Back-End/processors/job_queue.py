@@ -0,0 +1,126 @@
+# processors/job_queue.py
+import asyncio
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+import database_function as db
+from processors.submission_processor import process_submission
+
+WORKER_COUNT = int(os.getenv("SUBMISSION_WORKERS", "4"))
+MAX_RETRIES = int(os.getenv("SUBMISSION_MAX_RETRIES", "3"))
+RETRY_BASE_DELAY = float(os.getenv("SUBMISSION_RETRY_BASE_DELAY", "2"))
+RETRY_MAX_DELAY = float(os.getenv("SUBMISSION_RETRY_MAX_DELAY", "60"))
+RESUME_WINDOW_HOURS = int(os.getenv("SUBMISSION_RESUME_WINDOW_HOURS", "24"))
+# Another worker's resume claim is honoured for this long.
+RESUME_CLAIM_SECONDS = int(os.getenv("SUBMISSION_RESUME_CLAIM_SECONDS", "600"))
+# Uploads larger than this wait in the queue on disk instead of in memory.
+SPOOL_THRESHOLD_BYTES = int(os.getenv("SUBMISSION_SPOOL_THRESHOLD_BYTES", str(1024 * 1024)))
+
+# Statuses written by process_submission before the final decision lands.
+# "All done" rows are only resumed while their attendance is still PENDING:
+# before the decision stage wrote 'decided', decided rows kept "All done".
+RESUMABLE_STATUSES = ["pending", "ocr_done", "embedding_done", "All done"]
+
+_queue = None
+_workers = []
+_queued_ids = set()
+
+
+def _retry_delay(attempt: int) -> float:
+    delay = min(RETRY_BASE_DELAY * (2 ** (attempt - 1)), RETRY_MAX_DELAY)
+    return delay + random.uniform(0, delay / 2)
+
+
+def _hold_image(image_bytes):
+    if image_bytes is None or len(image_bytes) <= SPOOL_THRESHOLD_BYTES:
+        return image_bytes
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_THRESHOLD_BYTES)
+    spool.write(image_bytes)
+    return spool
+
+
+def _release_image(held):
+    if held is None or isinstance(held, bytes):
+        return held
+
+    try:
+        held.seek(0)
+        return held.read()
+    finally:
+        held.close()
+
+
+async def _run_job(submission_id: str, held_image):
+    image_bytes = _release_image(held_image)
+
+    for attempt in range(1, MAX_RETRIES + 2):
+        try:
+            await process_submission(submission_id, image_bytes=image_bytes)
+            return
+        except Exception as e:
+            if attempt > MAX_RETRIES:
+                print(f"[QUEUE] Giving up on {submission_id} after {attempt} attempts: {e}")
+                return
+
+            delay = _retry_delay(attempt)
+            print(f"[QUEUE] {submission_id} failed (attempt {attempt}): {e}. Retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def _worker(worker_id: int):
+    while True:
+        submission_id, held_image = await _queue.get()
+        try:
+            await _run_job(submission_id, held_image)
+        finally:
+            _queued_ids.discard(submission_id)
+            _queue.task_done()
+
+
+def enqueue(submission_id: str, image_bytes: bytes = None):
+    """
+    Queues a submission for processing. Fresh uploads pass their bytes so OCR
+    skips downloading the image back from storage; resumed and reprocessed
+    submissions fall back to fetching image_url.
+    """
+    if submission_id in _queued_ids:
+        return
+    _queued_ids.add(submission_id)
+    _queue.put_nowait((submission_id, _hold_image(image_bytes)))
+
+
+def resume_unfinished():
+    since = (datetime.now() - timedelta(hours=RESUME_WINDOW_HOURS)).isoformat()
+    # Claimed atomically, so with several web workers each row is resumed once.
+    rows = db.claim_resumable_submissions(RESUMABLE_STATUSES, since, RESUME_CLAIM_SECONDS).data or []
+
+    for row in rows:
+        enqueue(row["id"])
+
+    print(f"[QUEUE] Resumed {len(rows)} unfinished submissions")
+
+
+async def start():
+    global _queue
+
+    _queue = asyncio.Queue()
+
+    for i in range(WORKER_COUNT):
+        _workers.append(asyncio.create_task(_worker(i)))
+
+    print(f"[QUEUE] Started {WORKER_COUNT} submission workers")
+
+    try:
+        resume_unfinished()
+    except Exception as e:
+        print("[QUEUE] Resume failed:", e)
+
+
+async def stop():
+    for task in _workers:
+        task.cancel()
+
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
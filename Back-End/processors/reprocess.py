@@ -0,0 +1,95 @@
+# processors/reprocess.py
+"""
+Re-drives the submission pipeline for a whole lecture or a date range.
+Stages whose output is already stored are skipped unless named in --redo
+or downstream of a stage that runs.
+
+    python -m processors.reprocess --lecture-instance-id <id> --redo decision
+    python -m processors.reprocess --start-date 2025-01-06 --end-date 2025-01-10
+"""
+import argparse
+import asyncio
+import json
+import os
+import database_function as db
+from processors.submission_processor import process_submission, STAGES
+from utils import providers, rate_limiter
+
+REPROCESS_CONCURRENCY = int(os.getenv("REPROCESS_CONCURRENCY", "4"))
+STAGE_NAMES = [stage.name for stage in STAGES]
+
+
+def parse_redo(redo: str) -> tuple:
+    stages = tuple(s.strip() for s in (redo or "").split(",") if s.strip())
+    unknown = set(stages) - set(STAGE_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown stages {sorted(unknown)}; expected any of {STAGE_NAMES}")
+    return stages
+
+
+def find_submission_ids(lecture_instance_id=None, start_date=None, end_date=None, teacher_id=None) -> list:
+    rows = db.get_submissions_for_reprocess(
+        lecture_instance_id=lecture_instance_id,
+        start_date=start_date,
+        end_date=end_date,
+        teacher_id=teacher_id
+    )
+    return [row["id"] for row in rows]
+
+
+async def reprocess_submissions(submission_ids: list, redo=(), concurrency: int = REPROCESS_CONCURRENCY):
+    """Yields one progress dict per submission as each finishes."""
+    limit = asyncio.Semaphore(concurrency)
+
+    async def run(submission_id):
+        async with limit:
+            try:
+                with rate_limiter.priority(rate_limiter.PRIORITY_BACKGROUND):
+                    timings = await process_submission(submission_id, force=redo)
+                return {"submission_id": submission_id, "status": "done", "timings": timings}
+            except Exception as e:
+                print(f"[REPROCESS] {submission_id} failed: {e}")
+                return {"submission_id": submission_id, "status": "failed", "error": str(e)}
+
+    tasks = [asyncio.create_task(run(submission_id)) for submission_id in submission_ids]
+
+    try:
+        for completed, task in enumerate(asyncio.as_completed(tasks), start=1):
+            result = await task
+            result["completed"] = completed
+            result["total"] = len(tasks)
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def main(args):
+    submission_ids = find_submission_ids(
+        lecture_instance_id=args.lecture_instance_id,
+        start_date=args.start_date,
+        end_date=args.end_date
+    )
+    print(f"[REPROCESS] {len(submission_ids)} submissions to process")
+
+    async for progress in reprocess_submissions(
+        submission_ids, redo=parse_redo(args.redo), concurrency=args.concurrency
+    ):
+        print(json.dumps(progress))
+
+    await providers.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lecture-instance-id")
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--redo", help=f"comma-separated stages to rerun: {','.join(STAGE_NAMES)}")
+    parser.add_argument("--concurrency", type=int, default=REPROCESS_CONCURRENCY)
+    args = parser.parse_args()
+
+    if not (args.lecture_instance_id or (args.start_date and args.end_date)):
+        parser.error("pass --lecture-instance-id or both --start-date and --end-date")
+
+    asyncio.run(main(args))
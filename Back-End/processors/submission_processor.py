@@ -1,80 +1,179 @@
 # processors/submission_processor.py
 from utils.aicheck_engine import detect_ai_content
-from utils.ocr_engine import extract_text_from_file
-from utils.embed_engine import embed_text
+from utils.ocr_engine import extract_text_from_file, fetch_image
+from utils.result_cache import hash_bytes
+from utils.embed_engine import embed_text, EMBED_MODEL
 from supabase_client import supabase
 import database_function as db
-from core.ai_decision import ai_decision_and_update_attendance
+import asyncio
+from core.ai_decision import ai_decision_and_update_attendance, DECISION_MODE
+from processors.pipeline import Stage, run_pipeline
+from utils import vector_index, status_bus
+from utils.vector_index import to_vector
+import os
 
-async def process_submission(submission_id: str):
-    print(f"[PROCESSOR] Starting OCR for submission: {submission_id}")
+# "memory" keeps a per-lecture NumPy index in this process; "db" uses the
+# find_max_similarity_for_submission RPC (needed with several app workers).
+SIMILARITY_BACKEND = os.getenv("SIMILARITY_BACKEND", "memory")
 
-    record = db.get_submission(submission_id)
 
-    if not record.data:
-        print("[PROCESSOR] No submission found.")
-        return
+async def _ocr_stage(record: dict) -> dict:
+    print(f"[PROCESSOR] Starting OCR for submission: {record['id']}")
+
+    image_bytes = record.get("image_bytes")
+    image_hash = None
 
-    image_url = record.data["image_url"]
-   
-    ocr_text = await extract_text_from_file(image_url)
+    if image_bytes is None:
+        try:
+            image_bytes = await fetch_image(record["image_url"])
+        except Exception as e:
+            print("[PROCESSOR] Image fetch failed:", e)
+
+    if image_bytes is not None:
+        image_hash = hash_bytes(image_bytes)
+
+    ocr_text = await extract_text_from_file(
+        record["image_url"],
+        image_bytes=image_bytes,
+        image_hash=image_hash
+    )
 
     print("[PROCESSOR] OCR Output:", ocr_text[:80], "...")
 
-    db.update_submission(submission_id, {
+    return {
         "ocr_text": ocr_text,
+        "image_hash": image_hash,
         "status": "ocr_done"
-    })
+    }
 
-    print("[PROCESSOR] OCR completed and saved.")
 
+async def _ai_check_stage(record: dict) -> dict:
     print("[AI DETECTION started...]")
 
-    ai_json = await detect_ai_content(ocr_text)
-    
-    print("[AI DETECTION] output:", ai_json["reason"][:20],"...")
+    ai_json = await detect_ai_content(record["ocr_text"])
+
+    print("[AI DETECTION] output:", ai_json["reason"][:20], "...")
 
-    db.update_submission(submission_id, {
+    return {
         "ai_score": ai_json["ai_score"],
         "ai_confidence": ai_json["confidence"],
-        "ai_reason": ai_json["reason"]
-    })
+        "ai_reason": ai_json["reason"],
+        "ai_status": "Done"
+    }
 
-    print("[PROCESSOR] OCR completed and saved.")
 
-    db.update_submission(submission_id, {
-        "ai_status":"Done"
-    })
+async def _embed_stage(record: dict) -> dict:
+    print(f"[PROCESSOR] Starting embedding for submission: {record['id']}")
 
-    print("[AI detection] Detection completed and saved.")
+    embedding_vector = await embed_text(record["ocr_text"])
 
-    print(f"[PROCESSOR] Starting embedding for submission: {submission_id}")
-    embedding_vector = await embed_text(ocr_text)
-    
-    db.update_submission(submission_id, {
+    return {
         "embedding": embedding_vector,
+        "embedding_model": EMBED_MODEL if embedding_vector else None,
         "status": "embedding_done"
-    })
+    }
+
+
+async def _find_duplicate_image(record: dict) -> dict:
+    if record.get("image_hash"):
+        duplicate = (await asyncio.to_thread(
+            db.find_submission_by_image_hash,
+            record["lecture_instance_id"],
+            record["image_hash"],
+            record["id"],
+            record["uploaded_at"]
+        )).data
+
+        if duplicate:
+            print("[PROCESSOR] Exact duplicate image of submission:", duplicate[0]["id"])
+            return {
+                "copied_from_submission_id": duplicate[0]["id"],
+                "max_similarity": 1.0,
+                "status": "All done"
+            }
+
+    return None
+
 
-    print("[PROCESSOR] Embedding completed and saved.")
- 
-    print("[PROCESSOR] Starting similarity cosine search...")
+async def _similarity_stage(record: dict) -> dict:
+    vector = to_vector(record["embedding"])
+    index = None
 
-    similarity_result = db.find_max_similarity(submission_id)
+    if SIMILARITY_BACKEND == "memory" and vector is not None:
+        index = await vector_index.get_index(record["lecture_instance_id"], len(vector))
 
-    data = similarity_result.data
+    try:
+        duplicate = await _find_duplicate_image(record)
+        if duplicate:
+            return duplicate
 
-    if not data:
-        print("[PROCESSOR] No similar submissions found.")
+        print("[PROCESSOR] Starting similarity cosine search...")
+        update_data = {"status": "All done"}
 
-    match = data[0]
-    db.update_submission(submission_id, {
-        "copied_from_submission_id": match["matched_submission_id"],
-        "max_similarity": match["similarity"],
-        "status": "All done"
-    })
+        if index is not None:
+            match = index.best_match(vector, exclude_id=record["id"])
+        else:
+            data = (await asyncio.to_thread(db.find_max_similarity, record["id"])).data
+            match = (data[0]["matched_submission_id"], data[0]["similarity"]) if data else None
 
-    print("[PROCESSOR] Similarity search completed.")
+        if not match:
+            print("[PROCESSOR] No similar submissions found.")
+        else:
+            update_data["copied_from_submission_id"] = match[0]
+            update_data["max_similarity"] = match[1]
 
-    # Trigger AI Decision
-    await ai_decision_and_update_attendance(submission_id, supabase)
+        return update_data
+    finally:
+        if index is not None:
+            index.add(record["id"], vector)
+
+
+async def _decision_stage(record: dict) -> dict:
+    if DECISION_MODE == "batch":
+        lecture = (await asyncio.to_thread(db.get_lecture_instance, record["lecture_instance_id"])).data
+        if lecture and lecture["status"] == "live":
+            print("[PROCESSOR] Decision deferred to the lecture-close batch")
+            return {}
+
+    # Not a submissions column; kept on the working state for the status event.
+    record["decision"] = await ai_decision_and_update_attendance(record["id"], supabase)
+
+    return {"status": "decided"}
+
+
+STAGES = [
+    Stage("ocr", _ocr_stage,
+          skip=lambda r: bool(r["ocr_text"])),
+    Stage("ai_check", _ai_check_stage, depends_on=["ocr"],
+          skip=lambda r: r["ai_status"] == "Done"),
+    Stage("embedding", _embed_stage, depends_on=["ocr"],
+          skip=lambda r: bool(r["embedding"])),
+    Stage("similarity", _similarity_stage, depends_on=["ai_check", "embedding"],
+          skip=lambda r: r["status"] in ("All done", "decided")),
+    Stage("decision", _decision_stage, depends_on=["similarity"],
+          skip=lambda r: r["status"] == "decided"),
+]
+
+
+async def process_submission(submission_id: str, image_bytes: bytes = None, force=()) -> dict:
+    record = await asyncio.to_thread(db.get_submission, submission_id)
+
+    if not record.data:
+        print("[PROCESSOR] No submission found.")
+        return {}
+
+    # Working state only; stages write back just the fields they return.
+    state = dict(record.data)
+    state["image_bytes"] = image_bytes
+
+    def publish(updates):
+        if "status" in updates:
+            status_bus.publish_status(state, updates["status"], state.get("decision"))
+
+    return await run_pipeline(
+        STAGES,
+        state,
+        lambda updates: db.update_submission(submission_id, updates),
+        force=force,
+        on_update=publish
+    )
@@ -0,0 +1,41 @@
+from core import decision_rules
+
+CONCEPT = "binary search trees"
+ON_CONCEPT_TEXT = " ".join(
+    ["binary search trees keep keys ordered so lookup insertion and deletion"] * 4
+    + ["run in logarithmic time when the tree stays balanced"] * 2
+)
+
+
+def _submission(**overrides):
+    submission = {
+        "id": "s1",
+        "ocr_text": ON_CONCEPT_TEXT,
+        "concept": CONCEPT,
+        "ai_score": 5,
+        "ai_confidence": "HIGH",
+        "ai_reason": "Handwritten notes",
+        "max_similarity": 0.3,
+        "copied_from_submission_id": "s0"
+    }
+    submission.update(overrides)
+    return submission
+
+
+def test_substantive_on_concept_is_present():
+    decision = decision_rules.evaluate(_submission())
+    assert decision["attendance_decision"] == "PRESENT"
+
+
+def test_failed_ai_check_is_escalated():
+    failed = _submission(ai_score=0, ai_confidence=None, ai_reason="Detection failed")
+    assert decision_rules.evaluate(failed) is None
+
+
+def test_missing_similarity_is_escalated():
+    assert decision_rules.evaluate(_submission(max_similarity=None)) is None
+
+
+def test_copy_is_absent_without_ai_check():
+    copied = _submission(max_similarity=0.99, ai_confidence=None, ai_reason="Detection failed")
+    assert decision_rules.evaluate(copied)["attendance_decision"] == "ABSENT"
@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+
+pytest.importorskip("supabase")
+pytest.importorskip("instructor")
+
+from processors import submission_processor
+
+# Two uploads of the same photo: A first, then B re-uploads it.
+ROWS = [
+    {"id": "b", "lecture_instance_id": "l1", "image_hash": "h", "uploaded_at": "2025-01-06T09:05:00"},
+    {"id": "a", "lecture_instance_id": "l1", "image_hash": "h", "uploaded_at": "2025-01-06T09:00:00"},
+]
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+def _find(lecture_instance_id, image_hash, submission_id, uploaded_at):
+    earlier = sorted(
+        (r for r in ROWS
+         if r["lecture_instance_id"] == lecture_instance_id and r["image_hash"] == image_hash
+         and (r["uploaded_at"], r["id"]) < (uploaded_at, submission_id)),
+        key=lambda r: (r["uploaded_at"], r["id"])
+    )
+    return _Result([{"id": r["id"]} for r in earlier[:1]])
+
+
+@pytest.fixture(autouse=True)
+def fake_lookup(monkeypatch):
+    monkeypatch.setattr(submission_processor.db, "find_submission_by_image_hash", _find)
+
+
+def _duplicate_of(submission_id):
+    record = next(r for r in ROWS if r["id"] == submission_id)
+    return asyncio.run(submission_processor._find_duplicate_image(dict(record)))
+
+
+def test_later_upload_is_flagged_as_copy():
+    assert _duplicate_of("b") == {
+        "copied_from_submission_id": "a",
+        "max_similarity": 1.0,
+        "status": "All done"
+    }
+
+
+def test_earlier_uploader_stays_clean():
+    assert _duplicate_of("a") is None
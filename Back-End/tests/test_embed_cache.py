@@ -0,0 +1,42 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("instructor")
+pytest.importorskip("groq")
+pytest.importorskip("openai")
+pytest.importorskip("google.genai")
+
+from utils import embed_engine, result_cache
+
+
+class _FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, input, model):
+        self.calls.append(model)
+        size = 3 if model == "old-model" else 4
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=[0.5] * size) for i in range(len(input))
+        ])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    embeddings = _FakeEmbeddings()
+    fake = SimpleNamespace(embeddings=embeddings)
+    monkeypatch.setattr(embed_engine.providers, "get", lambda name: fake)
+    monkeypatch.setattr(result_cache, "_disk", None)
+    monkeypatch.setattr(embed_engine, "embed_cache", result_cache.ResultCache("embedding"))
+    return embeddings
+
+
+def test_model_change_misses_the_cache(client, monkeypatch):
+    monkeypatch.setattr(embed_engine, "EMBED_MODEL", "old-model")
+    assert len(asyncio.run(embed_engine.embed_text("notes"))) == 3
+
+    monkeypatch.setattr(embed_engine, "EMBED_MODEL", "new-model")
+    assert len(asyncio.run(embed_engine.embed_text("notes"))) == 4
+    assert len(asyncio.run(embed_engine.embed_texts(["notes"]))[0]) == 4
+    assert client.calls == ["old-model", "new-model"]
@@ -0,0 +1,52 @@
+import asyncio
+from processors.pipeline import Stage, run_pipeline
+
+
+def _stages(ran):
+    def stage(name):
+        async def run(record):
+            ran.append(name)
+            return {name: "new"}
+        return run
+
+    def present(name):
+        return lambda r: r.get(name) is not None
+
+    return [
+        Stage("ocr", stage("ocr"), skip=present("ocr")),
+        Stage("ai_check", stage("ai_check"), depends_on=["ocr"], skip=present("ai_check")),
+        Stage("embedding", stage("embedding"), depends_on=["ocr"], skip=present("embedding")),
+        Stage("similarity", stage("similarity"), depends_on=["ai_check", "embedding"], skip=present("similarity")),
+        Stage("decision", stage("decision"), depends_on=["similarity"], skip=present("decision")),
+    ]
+
+
+def _run(force, **record_values):
+    ran = []
+    record = dict.fromkeys(["ocr", "ai_check", "embedding", "similarity", "decision"], "old")
+    record.update(record_values)
+    asyncio.run(run_pipeline(_stages(ran), record, lambda updates: None, force=force))
+    return ran
+
+
+def test_nothing_reruns_without_force():
+    assert _run(()) == []
+
+
+def test_force_reruns_downstream_stages():
+    assert _run(("embedding",)) == ["embedding", "similarity", "decision"]
+
+
+def test_force_leaves_sibling_stages_alone():
+    ran = _run(("ocr",))
+    assert ran[0] == "ocr"
+    assert sorted(ran) == sorted(["ocr", "ai_check", "embedding", "similarity", "decision"])
+    assert _run(("decision",)) == ["decision"]
+
+
+
+def test_missing_output_reruns_downstream_stages():
+    ran = _run((), ocr=None)
+    assert ran[0] == "ocr"
+    assert sorted(ran) == sorted(["ocr", "ai_check", "embedding", "similarity", "decision"])
+    assert _run((), similarity=None) == ["similarity", "decision"]
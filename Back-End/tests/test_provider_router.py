@@ -0,0 +1,62 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from utils.provider_router import ProviderRouter
+
+_started = ContextVar("started")
+
+
+@contextmanager
+def on_start(callback):
+    token = _started.set(callback)
+    try:
+        yield
+    finally:
+        _started.reset(token)
+
+
+def provider(name, queued=0.0, latency=0.0, fail=False):
+    """Waits `queued` seconds for a fake rate-limit token, then `latency` with the provider."""
+    async def call():
+        await asyncio.sleep(queued)
+        _started.get()(True)
+        await asyncio.sleep(latency)
+        if fail:
+            raise RuntimeError(f"{name} failed")
+        return name
+    return call
+
+
+def router(primary, fallback):
+    return ProviderRouter("test", [("primary", primary), ("fallback", fallback)],
+                          min_samples=1000, default_hedge_delay=0.1, min_hedge_delay=0.01,
+                          on_start=on_start)
+
+
+def test_queued_call_is_not_hedged():
+    r = router(provider("primary", queued=0.3, latency=0.01), provider("fallback"))
+    assert asyncio.run(r.call()) == "primary"
+    assert r.hedges == 0
+
+
+def test_slow_provider_call_is_hedged():
+    r = router(provider("primary", latency=1.0), provider("fallback", latency=0.01))
+    assert asyncio.run(r.call()) == "fallback"
+    assert r.hedges == 1
+
+
+def test_latency_excludes_queue_time():
+    r = router(provider("primary", queued=0.2, latency=0.01), provider("fallback"))
+    asyncio.run(r.call())
+    assert r.routes[0].p95() < 0.1
+
+
+def test_failed_and_cancelled_calls_count_towards_p95():
+    r = router(provider("primary", latency=0.05, fail=True), provider("fallback", latency=0.01))
+    asyncio.run(r.call())
+    assert r.routes[0].samples() == 1
+
+    r = router(provider("primary", latency=1.0), provider("fallback", latency=0.01))
+    asyncio.run(r.call())
+    assert r.routes[0].samples() == 1
+    assert r.routes[0].p95() >= 0.1
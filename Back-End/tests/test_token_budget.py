@@ -0,0 +1,39 @@
+from utils import token_budget
+from utils.token_budget import count_tokens, fit, STAGE_BUDGETS, TRUNCATION_MARKER
+
+
+def test_text_within_budget_is_unchanged():
+    text = "short notes on recursion"
+    assert fit(text, "aicheck") == text
+
+
+def test_word_dense_text_never_grows():
+    text = "a " * 2000
+    fitted = fit(text, "aicheck")
+    assert len(fitted) < len(text)
+    assert count_tokens(fitted) <= STAGE_BUDGETS["aicheck"]
+    assert TRUNCATION_MARKER in fitted
+
+
+def test_long_words_are_cut_by_characters():
+    text = "x" * 10000 + " end"
+    fitted = fit(text, "aicheck")
+    assert count_tokens(fitted) <= STAGE_BUDGETS["aicheck"]
+    assert fitted.startswith("xxxx")
+    assert fitted.endswith(" end")
+
+
+def test_head_and_tail_are_kept_in_order():
+    text = " ".join(f"w{i}" for i in range(3000))
+    fitted = fit(text, "aicheck")
+    head, tail = fitted.split(TRUNCATION_MARKER)
+    assert text.startswith(head)
+    assert text.endswith(tail)
+    assert len(head) + len(tail) < len(text)
+    assert count_tokens(fitted) <= STAGE_BUDGETS["aicheck"]
+
+
+def test_truncation_is_counted():
+    before = token_budget.stats().get("decision", {}).get("truncated", 0)
+    fit("word " * 5000, "decision")
+    assert token_budget.stats()["decision"]["truncated"] == before + 1
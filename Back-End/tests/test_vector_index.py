@@ -0,0 +1,57 @@
+import asyncio
+import time
+import numpy as np
+import pytest
+
+pytest.importorskip("supabase")
+
+from utils import vector_index
+from utils.ttl_cache import TTLCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(vector_index, "_indexes", TTLCache("vector_index", 2, 0.2))
+    monkeypatch.setattr(vector_index, "_load_locks", {})
+    monkeypatch.setattr(vector_index, "_closed", TTLCache("closed_lectures", 10, 0.2))
+    monkeypatch.setattr(vector_index, "_load", lambda lecture_instance_id, dim: vector_index.LectureIndex(dim))
+
+
+def _index(lecture_instance_id):
+    return asyncio.run(vector_index.get_index(lecture_instance_id, 2))
+
+
+def test_re_adding_a_submission_replaces_its_vector():
+    index = vector_index.LectureIndex(2)
+    index.add("s1", np.array([1.0, 0.0], dtype=np.float32))
+    index.add("s1", np.array([0.0, 1.0], dtype=np.float32))
+
+    assert len(index) == 1
+    assert index.best_match(np.array([0.0, 1.0], dtype=np.float32)) == ("s1", pytest.approx(1.0))
+
+
+def test_add_after_eviction_is_ignored():
+    index = _index("l1")
+    vector_index.evict("l1")
+    index.add("late", np.ones(2, dtype=np.float32))
+
+    assert len(index) == 0
+    assert _index("l1") is None
+
+
+def test_idle_lectures_expire():
+    first = _index("l1")
+    time.sleep(0.3)
+    assert vector_index.stats()["lectures"] == 0
+    assert _index("l1") is not first
+
+
+def test_least_recently_used_lecture_is_dropped():
+    first = _index("l1")
+    _index("l2")
+    _index("l1")
+    _index("l3")
+
+    assert _index("l1") is first
+    assert vector_index.stats()["lectures"] == 2
+    assert vector_index.stats()["evictions"] >= 1
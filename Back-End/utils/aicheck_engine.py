@@ -1,29 +1,19 @@
 # utils/aicheck_engine.py
-import os
-import instructor
-from dotenv import load_dotenv
 from pydantic import BaseModel
-from groq import Groq
+from utils import providers, token_budget, rate_limiter
+from utils.result_cache import aicheck_cache, hash_text
 
-load_dotenv()   
-
-keys = os.getenv("GROQ_API_KEY")
-client = instructor.from_groq(
-    Groq(api_key = keys),
-    mode=instructor.Mode.JSON)
-
-async def detect_ai_content(text: str) -> dict:
-    prompt = f"""
-You are an academic integrity analysis system.
+# Kept byte-identical across calls so the provider can reuse the prefix.
+SYSTEM_PROMPT = """You are an academic integrity analysis system.
 
 Analyze the following student response and estimate the likelihood that it was generated by an AI system.
 
 Return STRICT JSON ONLY:
-{{
+{
   "ai_score": number (0-100),
   "confidence": "LOW" | "MEDIUM" | "HIGH",
   "reason": "short technical justification"
-}}
+}
 
 Scoring rules:
 - 0 = confidently human-written
@@ -44,29 +34,51 @@ Restrictions:
 - Do NOT assume low entropy implies AI without normalization.
 - The reason MUST reference at least one of:
   predictability, entropy variance, structural repetition, or optimization pressure.
+"""
+
+
+class UserInfo(BaseModel):
+    ai_score: int
+    confidence: str
+    reason: str
+
+
+async def detect_ai_content(text: str) -> dict:
+    cache_key = hash_text(text)
+    cached = aicheck_cache.get(cache_key)
+    if cached is not None:
+        print("[AI DETECTION] Cache hit")
+        return cached
 
-Text:
-\"\"\"{text}\"\"\"
+    prompt = f"""Text:
+\"\"\"{token_budget.fit(text, "aicheck")}\"\"\"
 """
-    class UserInfo(BaseModel):
-        ai_score: int
-        confidence: str
-        reason: str
     try:
-        response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        response_model=UserInfo,
-        messages=[
-        {"role": "user", "content": prompt}
-        ],
-        temperature = 0.5,
-        max_retries = 0
+        response, completion = await rate_limiter.run(
+            "groq", "llama-3.3-70b-versatile",
+            lambda: providers.get("groq_instructor").chat.completions.create_with_completion(
+            model="llama-3.3-70b-versatile",
+            response_model=UserInfo,
+            messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+            ],
+            temperature = 0.5,
+            max_retries = 0
+            )
         )
+        token_budget.record_usage("aicheck", completion)
         if not response:
             return {"ai_score": 0, "confidence": None, "reason": "No response"}
 
-        return dict(response)
+        result = dict(response)
+        aicheck_cache.set(cache_key, result)
+        return result
 
     except Exception as e:
+        if rate_limiter.is_rate_limited(e):
+            # Still throttled after queueing and retrying: fail the stage so
+            # the submission is retried later instead of storing a fake score.
+            raise
         print("[AI DETECTION ERROR]", e)
         return {"ai_score": 0, "confidence": None, "reason": "Detection failed"}
@@ -0,0 +1,18 @@
+# utils/concurrency.py
+import asyncio
+import os
+
+PROVIDER_LIMITS = {
+    "groq": int(os.getenv("GROQ_MAX_CONCURRENCY", "8")),
+    "gemini": int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+    "embedding": int(os.getenv("EMBED_MAX_CONCURRENCY", "4")),
+}
+
+_semaphores = {}
+
+
+def provider_slot(provider: str) -> asyncio.Semaphore:
+    """Shared semaphore capping in-flight calls to one provider."""
+    if provider not in _semaphores:
+        _semaphores[provider] = asyncio.Semaphore(PROVIDER_LIMITS[provider])
+    return _semaphores[provider]
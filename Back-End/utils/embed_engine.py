@@ -1,23 +1,77 @@
-from openai import OpenAI
+import asyncio
+import os
+from utils.concurrency import provider_slot
+from utils import providers
+from utils.result_cache import embed_cache, hash_text
 
-client = OpenAI(
-    base_url = "http://192.168.1.7:1234/v1",
-    api_key = "lm-studio"
-)
+EMBED_MODEL = os.getenv("EMBED_MODEL", "text-embedding-nomic-embed-text-v1.5")
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+EMBED_BATCH_CONCURRENCY = int(os.getenv("EMBED_BATCH_CONCURRENCY", "2"))
+
+def _cache_key(text: str) -> str:
+    # Vectors from different models (and dimensions) must never share an entry.
+    return hash_text(f"{EMBED_MODEL}\0{text}")
 
 async def embed_text(text: str) -> list:
+    cache_key = _cache_key(text)
+    cached = embed_cache.get(cache_key)
+    if cached is not None:
+        print("[EMBEDDING] Cache hit")
+        return cached
+
     try:
         #text = text.replace("\n"," ")
-        embeddingVector = client.embeddings.create(
-        input = [text],
-        model = "text-embedding-nomic-embed-text-v1.5"
-        ).data[0].embedding
+        async with provider_slot("embedding"):
+            response = await providers.get("embedding").embeddings.create(
+            input = [text],
+            model = EMBED_MODEL
+            )
+        embeddingVector = response.data[0].embedding
         print("[EMBEDDING] Vector dimensions:", len(embeddingVector))
         if not embeddingVector:
             raise ValueError("Api failed to return embedding vector...")
+        embed_cache.set(cache_key, embeddingVector)
         return embeddingVector
 
     except Exception as e:
         print("[EMBEDDING ERROR]", e)
-        return [] 
-        
\ No newline at end of file
+        return []
+
+
+async def embed_texts(texts: list, batch_size: int = EMBED_BATCH_SIZE,
+                      concurrency: int = EMBED_BATCH_CONCURRENCY) -> list:
+    """
+    Embeds many texts with one request per batch. Returns vectors in input
+    order. Unlike embed_text, errors are raised so bulk callers can retry.
+    """
+    vectors = [None] * len(texts)
+    missing = []
+
+    for i, text in enumerate(texts):
+        cached = embed_cache.get(_cache_key(text))
+        if cached is not None:
+            vectors[i] = cached
+        else:
+            missing.append(i)
+
+    batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+    limit = asyncio.Semaphore(concurrency)
+
+    async def run_batch(positions):
+        async with limit, provider_slot("embedding"):
+            response = await providers.get("embedding").embeddings.create(
+                input=[texts[i] for i in positions],
+                model=EMBED_MODEL
+            )
+
+        if len(response.data) != len(positions):
+            raise ValueError(f"Expected {len(positions)} embeddings, got {len(response.data)}")
+
+        for item in response.data:
+            position = positions[item.index]
+            vectors[position] = item.embedding
+            embed_cache.set(_cache_key(texts[position]), item.embedding)
+
+    await asyncio.gather(*(run_batch(batch) for batch in batches))
+
+    return vectors
@@ -0,0 +1,76 @@
+# utils/image_preprocess.py
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+
+MAX_DIMENSION = int(os.getenv("OCR_MAX_DIMENSION", "2048"))
+JPEG_QUALITY = int(os.getenv("OCR_JPEG_QUALITY", "85"))
+GRAYSCALE = os.getenv("OCR_GRAYSCALE", "true").lower() == "true"
+PREPROCESS_WORKERS = int(os.getenv("OCR_PREPROCESS_WORKERS", "2"))
+
+_pool = None
+
+
+def _detect_mime(image_bytes: bytes) -> str:
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            return Image.MIME.get(img.format, "image/jpeg")
+    except Exception:
+        return "image/jpeg"
+
+
+def _preprocess_sync(image_bytes: bytes, max_dimension: int, quality: int, grayscale: bool):
+    """Runs in a worker process. Returns (bytes, mime_type)."""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_dimension, max_dimension))
+        img = img.convert("L" if grayscale else "RGB")
+
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=quality, optimize=True)
+
+    return out.getvalue(), "image/jpeg"
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PREPROCESS_WORKERS)
+    return _pool
+
+
+async def preprocess_image(image_bytes: bytes):
+    """
+    Auto-orients, downscales, optionally grayscales and recompresses an
+    upload before it is sent for OCR. Returns (bytes, mime_type); the
+    original bytes are kept when Pillow cannot decode them or the result
+    is not smaller.
+    """
+    loop = asyncio.get_running_loop()
+
+    try:
+        processed, mime_type = await loop.run_in_executor(
+            _get_pool(), _preprocess_sync, image_bytes, MAX_DIMENSION, JPEG_QUALITY, GRAYSCALE
+        )
+    except Exception as e:
+        print("[PREPROCESS ERROR]", e)
+        return image_bytes, _detect_mime(image_bytes)
+
+    if len(processed) >= len(image_bytes):
+        print("[PREPROCESS] Kept original image, no size reduction")
+        return image_bytes, _detect_mime(image_bytes)
+
+    saved = len(image_bytes) - len(processed)
+    print(f"[PREPROCESS] {len(image_bytes)} -> {len(processed)} bytes "
+          f"(saved {saved}, {saved * 100 // len(image_bytes)}%)")
+
+    return processed, mime_type
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
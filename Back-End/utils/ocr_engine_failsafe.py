@@ -1,9 +1,8 @@
-from groq import Groq
-import os
-from dotenv import load_dotenv
+import base64
+from utils import providers
+
+OCR_MODEL = "meta-llama/llama-4-maverick-17b-128e-instruct"
 
-load_dotenv()   
-keys = os.getenv("GROQ_API_KEY")
 prompt_ocr = """You are performing OCR and transcription ONLY.
 
 CRITICAL RULES:
@@ -32,35 +31,42 @@ Output format:
 Goal:
 Produce a faithful transcription that maximally preserves original authorship signals and entropy.
 """
-def ocr_extractor(file_url: str) -> str:
-    try:
-        client = Groq(api_key = keys)
-        completion = client.chat.completions.create(
-            model="meta-llama/llama-4-maverick-17b-128e-instruct",
-            messages=[
+def groq_ocr(file_url: str, image_bytes: bytes = None, mime_type: str = "image/jpeg") -> str:
+    if image_bytes is not None:
+        encoded = base64.b64encode(image_bytes).decode("ascii")
+        file_url = f"data:{mime_type};base64,{encoded}"
+
+    completion = providers.get("groq_sync").chat.completions.create(
+        model=OCR_MODEL,
+        messages=[
+            {
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": prompt_ocr
+                },
                 {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": prompt_ocr
-                    },
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": file_url
-                        }
+                    "type": "image_url",
+                    "image_url": {
+                        "url": file_url
                     }
-                ]
-            }
-        ],
-        temperature=0.1,
-        max_completion_tokens=1024,
-        top_p=1,
-        stream=False,
-        stop=None,
-        )
-        return str(completion.choices[0].message.content)
+                }
+            ]
+        }
+    ],
+    temperature=0.1,
+    max_completion_tokens=1024,
+    top_p=1,
+    stream=False,
+    stop=None,
+    )
+    return str(completion.choices[0].message.content)
+
+
+def ocr_extractor(file_url: str, image_bytes: bytes = None, mime_type: str = "image/jpeg") -> str:
+    try:
+        return groq_ocr(file_url, image_bytes=image_bytes, mime_type=mime_type)
     except Exception as e:
         print("[OCR ERROR]", e)
-        return ""
\ No newline at end of file
+        return ""
@@ -0,0 +1,277 @@
+# utils/provider_router.py
+import asyncio
+import time
+from collections import deque
+from contextlib import nullcontext
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; after
+    `cooldown` seconds one trial call is let through (half_open) and its
+    outcome closes or re-opens the breaker. Only touched from the event
+    loop, so no locking is needed.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_in_flight = False
+
+    def available(self) -> bool:
+        """Whether allow() would let a call through, without claiming the trial."""
+        if self.state == "open":
+            return time.monotonic() - self.opened_at >= self.cooldown
+        return self.state == "closed" or not self._trial_in_flight
+
+    def allow(self) -> bool:
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+            self._trial_in_flight = False
+
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def release_trial(self):
+        """A cancelled call says nothing about the provider's health."""
+        self._trial_in_flight = False
+
+
+class Route:
+    """One provider: an async callable plus its breaker and rolling stats."""
+
+    def __init__(self, name: str, call, failure_threshold: int, cooldown: float, window: int):
+        self.name = name
+        self.call = call
+        self.breaker = CircuitBreaker(failure_threshold, cooldown)
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+        self.calls = 0
+        self.wins = 0
+
+    def record(self, ok: bool, latency):
+        # Failed calls count towards p95 too, or a provider that times out
+        # would look fast and be hedged too late.
+        self._outcomes.append(ok)
+        self.record_latency(latency)
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def record_latency(self, latency):
+        if latency is not None:
+            self._latencies.append(latency)
+
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    def p95(self):
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def error_rate(self):
+        if not self._outcomes:
+            return None
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def stats(self) -> dict:
+        p95 = self.p95()
+        error_rate = self.error_rate()
+        return {
+            "breaker": self.breaker.state,
+            "times_opened": self.breaker.times_opened,
+            "consecutive_failures": self.breaker.failures,
+            "calls": self.calls,
+            "wins": self.wins,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "error_rate": round(error_rate, 3) if error_rate is not None else None
+        }
+
+
+class _Attempt:
+    """One call to one route. Its clock starts when the request reaches the provider."""
+
+    def __init__(self, route: Route, queued: bool):
+        self.route = route
+        self.started = asyncio.Event()
+        self.started_at = None
+        if not queued:
+            self.mark(True)
+
+    def mark(self, running: bool):
+        if running:
+            self.started_at = time.monotonic()
+            self.started.set()
+        else:
+            self.started_at = None
+            self.started.clear()
+
+    def elapsed(self):
+        if self.started_at is None:
+            return None
+        return time.monotonic() - self.started_at
+
+
+class ProviderRouter:
+    """
+    Calls providers in preference order, skipping those whose breaker is
+    open. If the running call has not answered within that provider's p95
+    latency, the next provider is started as a hedge and whichever succeeds
+    first wins; the other is cancelled. Failures move straight on to the
+    next provider. Raises the last error if every provider fails.
+
+    If the routes queue before calling out (e.g. behind rate_limiter.run),
+    pass that queue's start hook as `on_start`: it is entered around each
+    call with a callback(running) and latency is then measured, and hedging
+    considered, only while the request is actually with the provider.
+    """
+
+    def __init__(self, name: str, routes: list, failure_threshold: int = 5,
+                 cooldown: float = 30.0, window: int = 100, min_samples: int = 20,
+                 default_hedge_delay: float = 10.0, min_hedge_delay: float = 1.0,
+                 on_start=None):
+        self.name = name
+        self.routes = [
+            Route(route_name, call, failure_threshold, cooldown, window)
+            for route_name, call in routes
+        ]
+        self.min_samples = min_samples
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.on_start = on_start
+        self.hedges = 0
+        self.failures = 0
+
+    def hedge_delay(self, route: Route) -> float:
+        if route.samples() < self.min_samples:
+            return self.default_hedge_delay
+        return max(self.min_hedge_delay, route.p95())
+
+    async def _attempt(self, attempt: _Attempt, args, kwargs):
+        route = attempt.route
+        route.calls += 1
+        try:
+            with self.on_start(attempt.mark) if self.on_start else nullcontext():
+                result = await route.call(*args, **kwargs)
+        except asyncio.CancelledError:
+            # A hedge loser ran at least this long, which p95 should know about.
+            route.breaker.release_trial()
+            route.record_latency(attempt.elapsed())
+            raise
+        except Exception as e:
+            print(f"[ROUTER {self.name}] {route.name} failed: {e}")
+            route.record(False, attempt.elapsed())
+            raise
+        route.record(True, attempt.elapsed())
+        return result
+
+    async def call(self, *args, **kwargs):
+        remaining = list(self.routes)
+
+        def next_route():
+            while remaining:
+                route = remaining.pop(0)
+                if route.breaker.allow():
+                    return route
+            return None
+
+        def can_hedge():
+            return any(route.breaker.available() for route in remaining)
+
+        pending = {}
+
+        def launch(route):
+            attempt = _Attempt(route, queued=self.on_start is not None)
+            pending[asyncio.create_task(self._attempt(attempt, args, kwargs))] = attempt
+            return attempt
+
+        # With every breaker open, still try the preferred provider rather
+        # than failing the request outright.
+        current = launch(next_route() or self.routes[0])
+        last_error = None
+
+        try:
+            while True:
+                if not pending:
+                    route = next_route()
+                    if route is None:
+                        break
+                    current = launch(route)
+                    continue
+
+                waiting = set(pending)
+                timeout = None
+                start_waiter = None
+                if can_hedge():
+                    if current.started_at is None:
+                        # Still queued for a token: a hedge would only queue
+                        # behind it, so wait for the call to go out first.
+                        start_waiter = asyncio.create_task(current.started.wait())
+                        waiting.add(start_waiter)
+                    else:
+                        delay = self.hedge_delay(current.route)
+                        timeout = max(0.0, current.started_at + delay - time.monotonic())
+
+                try:
+                    done, _ = await asyncio.wait(waiting, timeout=timeout,
+                                                 return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    if start_waiter is not None:
+                        start_waiter.cancel()
+
+                done = [task for task in done if task in pending]
+                if not done:
+                    if start_waiter is not None:
+                        continue  # call went out; now time it
+                    route = next_route()
+                    if route is not None:
+                        self.hedges += 1
+                        print(f"[ROUTER {self.name}] {current.route.name} slower than {delay:.1f}s, "
+                              f"hedging with {route.name}")
+                        current = launch(route)
+                    continue
+
+                for task in done:
+                    route = pending.pop(task).route
+                    if task.exception() is None:
+                        route.wins += 1
+                        return task.result()
+                    last_error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self.failures += 1
+        raise last_error
+
+    def stats(self) -> dict:
+        return {
+            "hedges": self.hedges,
+            "failures": self.failures,
+            "providers": {route.name: route.stats() for route in self.routes}
+        }
@@ -0,0 +1,90 @@
+# utils/providers.py
+import os
+import httpx
+import instructor
+import requests
+from requests.adapters import HTTPAdapter
+from groq import Groq, AsyncGroq
+from openai import AsyncOpenAI
+from google import genai
+from google.genai import types
+from dotenv import load_dotenv
+
+load_dotenv()
+
+POOL_SIZE = int(os.getenv("PROVIDER_POOL_SIZE", "20"))
+KEEPALIVE_CONNECTIONS = int(os.getenv("PROVIDER_KEEPALIVE_CONNECTIONS", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("PROVIDER_KEEPALIVE_EXPIRY", "60"))
+CONNECT_TIMEOUT = float(os.getenv("PROVIDER_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("PROVIDER_READ_TIMEOUT", "60"))
+
+EMBED_BASE_URL = os.getenv("EMBED_BASE_URL", "http://192.168.1.7:1234/v1")
+EMBED_API_KEY = os.getenv("EMBED_API_KEY", "lm-studio")
+
+_clients = {}
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=POOL_SIZE,
+        max_keepalive_connections=KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+
+
+def _build():
+    async_http = httpx.AsyncClient(limits=_limits(), timeout=_timeout())
+    sync_http = httpx.Client(limits=_limits(), timeout=_timeout())
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    groq_async = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"), http_client=async_http)
+
+    _clients.update({
+        "async_http": async_http,
+        "sync_http": sync_http,
+        "session": session,
+        "groq": groq_async,
+        "groq_sync": Groq(api_key=os.getenv("GROQ_API_KEY"), http_client=sync_http),
+        "groq_instructor": instructor.from_groq(groq_async, mode=instructor.Mode.JSON),
+        "embedding": AsyncOpenAI(
+            base_url=EMBED_BASE_URL,
+            api_key=EMBED_API_KEY,
+            http_client=async_http
+        ),
+        "gemini": genai.Client(
+            api_key=str(os.getenv("GEMINI_API_KEY")),
+            http_options=types.HttpOptions(timeout=int(READ_TIMEOUT * 1000))
+        ),
+    })
+
+
+def get(name: str):
+    """Returns a shared client, building the registry on first use."""
+    if not _clients:
+        _build()
+    return _clients[name]
+
+
+async def startup():
+    if not _clients:
+        _build()
+    print(f"[PROVIDERS] Client registry ready (pool size {POOL_SIZE})")
+
+
+async def shutdown():
+    if not _clients:
+        return
+
+    await _clients["async_http"].aclose()
+    _clients["sync_http"].close()
+    _clients["session"].close()
+    _clients.clear()
+    print("[PROVIDERS] Client registry closed")
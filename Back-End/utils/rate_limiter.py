@@ -0,0 +1,200 @@
+# utils/rate_limiter.py
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from utils.concurrency import provider_slot
+
+# Lower value is served first.
+PRIORITY_LIVE = 0          # uploads moving through OCR / AI check / decision
+PRIORITY_BACKGROUND = 10   # chatbot, reprocessing, backfills
+
+# Requests per minute per (provider, model); Groq quotas are per model.
+PROVIDER_RPM = {
+    "groq": int(os.getenv("GROQ_RPM", "30")),
+    "gemini": int(os.getenv("GEMINI_RPM", "60")),
+}
+# Per-model overrides, e.g. RATE_LIMIT_OVERRIDES="groq/llama-3.3-70b-versatile=60"
+MODEL_RPM = {
+    key.strip(): int(value)
+    for key, value in (
+        item.split("=", 1) for item in os.getenv("RATE_LIMIT_OVERRIDES", "").split(",") if "=" in item
+    )
+}
+MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "5"))
+BACKOFF = float(os.getenv("RATE_LIMIT_BACKOFF", "5"))
+
+_priority = ContextVar("provider_priority", default=PRIORITY_LIVE)
+_on_start = ContextVar("provider_on_start", default=None)
+
+
+@contextmanager
+def priority(level: int):
+    """Provider calls made inside this block (and tasks it spawns) queue at `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def on_start(callback):
+    """
+    run() calls inside this block report callback(True) when the request
+    goes out to the provider and callback(False) when a 429 re-queues it.
+    """
+    token = _on_start.set(callback)
+    try:
+        yield
+    finally:
+        _on_start.reset(token)
+
+
+class TokenBucket:
+    """
+    Refills at rpm/60 tokens per second up to a small burst. Callers that
+    find it empty wait in a priority heap drained by one task per bucket,
+    so a burst queues up instead of going out and coming back as 429s.
+    """
+
+    def __init__(self, name: str, rpm: int):
+        self.name = name
+        self.rate = rpm / 60
+        self.capacity = max(1, rpm // 10)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._drainer = None
+        self.granted = 0
+        self.queued = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def _wait_time(self) -> float:
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self, level: int):
+        if not self._waiters and self._wait_time() == 0:
+            self.tokens -= 1
+            self.granted += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (level, next(self._seq), future))
+        self.queued += 1
+        if self._drainer is None or self._drainer.done():
+            self._drainer = asyncio.create_task(self._drain())
+
+        started = time.monotonic()
+        await future
+        self.wait_seconds += time.monotonic() - started
+
+    async def _drain(self):
+        while self._waiters:
+            delay = self._wait_time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue  # waiter was cancelled
+            self.tokens -= 1
+            self.granted += 1
+            future.set_result(None)
+
+    def pause(self, seconds: float):
+        """Provider said 429: stop granting until it should have recovered."""
+        self.throttled += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+        self.updated = self.paused_until
+
+    def stats(self) -> dict:
+        depth = {}
+        for level, _, future in self._waiters:
+            if not future.done():
+                depth[level] = depth.get(level, 0) + 1
+        return {
+            "queue_depth": sum(depth.values()),
+            "queue_depth_by_priority": depth,
+            "granted": self.granted,
+            "queued": self.queued,
+            "throttled": self.throttled,
+            "wait_seconds": round(self.wait_seconds, 1)
+        }
+
+
+_buckets = {}
+
+
+def _bucket(provider: str, model: str) -> TokenBucket:
+    key = f"{provider}/{model}"
+    if key not in _buckets:
+        _buckets[key] = TokenBucket(key, MODEL_RPM.get(key, PROVIDER_RPM[provider]))
+    return _buckets[key]
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    # instructor and the SDK wrappers chain the original HTTP error.
+    while error is not None:
+        if getattr(error, "status_code", None) == 429:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _retry_after(error: BaseException):
+    while error is not None:
+        response = getattr(error, "response", None)
+        value = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+        error = error.__cause__ or error.__context__
+    return None
+
+
+async def run(provider: str, model: str, call):
+    """
+    Awaits call() once a rate-limit token and a concurrency slot are free.
+    A 429 pauses the bucket for everyone and the call re-queues, up to
+    RATE_LIMIT_MAX_RETRIES times.
+    """
+    bucket = _bucket(provider, model)
+    started = _on_start.get()
+    for attempt in range(MAX_RETRIES + 1):
+        await bucket.acquire(_priority.get())
+        try:
+            async with provider_slot(provider):
+                if started:
+                    started(True)
+                return await call()
+        except Exception as e:
+            if not is_rate_limited(e) or attempt == MAX_RETRIES:
+                raise
+            if started:
+                started(False)
+            delay = _retry_after(e) or BACKOFF * 2 ** attempt
+            print(f"[RATE LIMIT] {bucket.name} returned 429, pausing {delay:.1f}s "
+                  f"(retry {attempt + 1}/{MAX_RETRIES})")
+            bucket.pause(delay)
+
+
+def stats() -> dict:
+    return {name: bucket.stats() for name, bucket in _buckets.items()}
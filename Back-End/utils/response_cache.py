@@ -0,0 +1,123 @@
+# utils/response_cache.py
+import hashlib
+import os
+from urllib.parse import parse_qsl, urlencode
+import jwt
+from utils.ttl_cache import TTLCache
+
+ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+
+# Keys are (path, user, variant) so writes can drop one user's entries for
+# a path, or the whole path, without knowing the exact query strings.
+_cache = TTLCache("responses", MAX_ENTRIES, 60)
+# Bumped by invalidate() so a response rendered across a write is not stored.
+_generation = 0
+
+stats_counters = {
+    "hits": 0,
+    "misses": 0,
+    "not_modified": 0
+}
+
+
+def _user_of(query: dict, headers: dict):
+    for param in ("user_id", "teacher_id"):
+        if query.get(param):
+            return query[param]
+
+    authorization = headers.get("authorization", "")
+    if authorization.startswith("Bearer "):
+        # Only used to group entries for invalidation; the endpoint still
+        # verifies the token, and the key includes the full header.
+        try:
+            return jwt.decode(authorization[7:], options={"verify_signature": False}).get("sub")
+        except jwt.InvalidTokenError:
+            return None
+    return None
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def invalidate(path: str, *users):
+    """Drops cached responses for path, for the given users or for everyone."""
+    global _generation
+    _generation += 1
+    users = set(users)
+    _cache.invalidate_matching(
+        lambda key: key[0] == path and (not users or key[1] in users)
+    )
+
+
+def stats() -> dict:
+    return dict(_cache.stats(), **stats_counters)
+
+
+class ResponseCacheMiddleware:
+    """
+    Caches 200 responses of the configured GET paths for a per-path TTL and
+    tags them with a strong ETag. A matching If-None-Match is answered with
+    304 whether the body came from the cache or was just rendered.
+    """
+
+    def __init__(self, app, ttls: dict):
+        self.app = app
+        self.ttls = ttls
+
+    async def __call__(self, scope, receive, send):
+        if (not ENABLED or scope["type"] != "http" or scope["method"] != "GET"
+                or scope["path"] not in self.ttls):
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        query = parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)
+        variant = hashlib.sha256(
+            (urlencode(sorted(query)) + "|" + headers.get("authorization", "")).encode()
+        ).hexdigest()
+        key = (scope["path"], _user_of(dict(query), headers), variant)
+
+        cached = _cache.get(key)
+        if cached is not None:
+            stats_counters["hits"] += 1
+            status, response_headers, body, etag = cached
+        else:
+            stats_counters["misses"] += 1
+            generation = _generation
+            status, response_headers, body = await self._render(scope, receive)
+            etag = _etag(body) if status == 200 else None
+            if etag and generation == _generation:
+                _cache.set(key, (status, response_headers, body, etag), ttl=self.ttls[scope["path"]])
+
+        if etag:
+            response_headers = [
+                (k, v) for k, v in response_headers if k.lower() not in (b"etag", b"cache-control")
+            ] + [(b"etag", etag.encode()), (b"cache-control", b"private, no-cache")]
+
+            if etag in headers.get("if-none-match", ""):
+                stats_counters["not_modified"] += 1
+                await send({
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(k, v) for k, v in response_headers if k.lower() != b"content-length"]
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        await send({"type": "http.response.start", "status": status, "headers": response_headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _render(self, scope, receive):
+        start = {}
+        chunks = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        return start["status"], list(start.get("headers", [])), b"".join(chunks)
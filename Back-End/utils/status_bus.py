@@ -0,0 +1,79 @@
+# utils/status_bus.py
+import asyncio
+import os
+from contextlib import contextmanager
+
+# Events buffered per subscriber; a client that falls further behind loses
+# the oldest ones rather than holding memory for the whole lecture.
+QUEUE_SIZE = int(os.getenv("STATUS_STREAM_QUEUE_SIZE", "100"))
+
+# channel -> set of subscriber queues. Publishing and subscribing both
+# happen on the event loop, so no lock is needed.
+_subscribers = {}
+
+stats_counters = {
+    "published": 0,
+    "delivered": 0,
+    "dropped": 0
+}
+
+
+def submission_channel(submission_id: str) -> str:
+    return f"submission:{submission_id}"
+
+
+def lecture_channel(lecture_instance_id: str) -> str:
+    return f"lecture:{lecture_instance_id}"
+
+
+def publish(event: dict):
+    """
+    Fans a submission status event out to the submission's subscribers and
+    to everyone watching its lecture. Events are only seen by subscribers
+    in this process.
+    """
+    stats_counters["published"] += 1
+    channels = [submission_channel(event["submission_id"])]
+    if event.get("lecture_instance_id"):
+        channels.append(lecture_channel(event["lecture_instance_id"]))
+
+    for channel in channels:
+        for queue in _subscribers.get(channel, ()):
+            if queue.full():
+                queue.get_nowait()
+                stats_counters["dropped"] += 1
+            queue.put_nowait(event)
+            stats_counters["delivered"] += 1
+
+
+def publish_status(submission: dict, status: str, decision: dict = None):
+    publish({
+        "submission_id": submission["id"],
+        "lecture_instance_id": submission.get("lecture_instance_id"),
+        "user_id": submission.get("user_id"),
+        "status": status,
+        "decision": decision
+    })
+
+
+@contextmanager
+def subscribe(channel: str):
+    """Yields a queue that receives every event published to channel."""
+    queue = asyncio.Queue(QUEUE_SIZE)
+    _subscribers.setdefault(channel, set()).add(queue)
+    try:
+        yield queue
+    finally:
+        queues = _subscribers.get(channel)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del _subscribers[channel]
+
+
+def stats() -> dict:
+    return dict(
+        stats_counters,
+        channels=len(_subscribers),
+        subscribers=sum(len(queues) for queues in _subscribers.values())
+    )
@@ -0,0 +1,115 @@
+# utils/teacher_context.py
+import os
+from datetime import date
+import database_function as db
+from utils import token_budget
+from utils.ttl_cache import TTLCache
+
+CONTEXT_TTL = int(os.getenv("CHAT_CONTEXT_TTL", "300"))
+CONTEXT_MAX_ENTRIES = int(os.getenv("CHAT_CONTEXT_MAX_ENTRIES", "500"))
+
+# teacher_id -> serialized context, ready to drop into the prompt.
+_cache = TTLCache("teacher_context", CONTEXT_MAX_ENTRIES, CONTEXT_TTL)
+# lecture_instance_id -> teacher_id; a lecture never changes teacher.
+_lecture_teachers = TTLCache("lecture_teachers", 10000, 86400)
+
+
+def _date(value) -> str:
+    # The prompt tells the model dates are dd-mm-yyyy.
+    try:
+        return date.fromisoformat(str(value)[:10]).strftime("%d-%m-%Y")
+    except ValueError:
+        return str(value)
+
+
+def _cell(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return " ".join(str(value).split()).replace("|", "/")
+
+
+def _table(title: str, columns: list, rows: list) -> str:
+    if not rows:
+        return f"{title}: none"
+    lines = [f"{title} ({' | '.join(columns)}):"]
+    lines += [" | ".join(_cell(value) for value in row) for row in rows]
+    return "\n".join(lines)
+
+
+def serialize(ctx: dict) -> str:
+    """
+    Renders the teacher_get_context JSON as small pipe-separated tables.
+    Column names appear once per table instead of once per row, and lecture
+    UUIDs are replaced by the date and class they stand for.
+    """
+    lectures = {}
+    for row in (ctx.get("recent_lectures") or []) + (ctx.get("attendance_summary") or []):
+        lectures[row["lecture_instance_id"]] = (_date(row["lecture_date"]), row["class_code"])
+
+    classes = dict.fromkeys(
+        (c["class_code"], c["class_name"]) for c in ctx.get("classes") or []
+    )
+
+    sections = [
+        _table("Classes", ["code", "name"], list(classes)),
+        _table("Recent lectures", ["date", "class", "concept"], [
+            (_date(r["lecture_date"]), r["class_code"], r["concept"])
+            for r in ctx.get("recent_lectures") or []
+        ]),
+        _table("Attendance per lecture", ["date", "class", "present", "absent", "od"], [
+            (_date(r["lecture_date"]), r["class_code"], r["present"], r["absent"], r["od"])
+            for r in ctx.get("attendance_summary") or []
+        ]),
+        _table("Recent submissions", ["date", "class", "student", "similarity", "ai_score", "ai_confidence", "ai_reason"], [
+            lectures.get(r["lecture_instance_id"], ("-", "-")) + (
+                r["student_name"], r["max_similarity"], r["ai_score"], r["ai_confidence"], r["ai_reason"]
+            )
+            for r in ctx.get("submissions_summary") or []
+        ]),
+        _table("Appeals", ["date", "student", "status", "reason"], [
+            (_date(r["lecture_date"]), r["student_name"], r["status"], r["reason"])
+            for r in ctx.get("appeals") or []
+        ]),
+    ]
+
+    return token_budget.fit("\n\n".join(sections), "chatbot")
+
+
+def _load(teacher_id: str) -> str:
+    ctx = db.get_teacher_context(teacher_id)
+    if not ctx.data:
+        raise LookupError(f"No context for teacher {teacher_id}")
+    return serialize(dict(ctx.data))
+
+
+def get(teacher_id: str) -> str:
+    """Serialized context for teacher_id, built once per CHAT_CONTEXT_TTL. Blocking."""
+    return _cache.get_or_load(teacher_id, lambda: _load(teacher_id))
+
+
+def invalidate(teacher_id: str):
+    _cache.invalidate(teacher_id)
+
+
+def invalidate_lecture(lecture_instance_id: str):
+    """Drops the context of the teacher who owns the lecture. Blocking."""
+    if not _cache.stats()["entries"]:
+        return
+
+    def owner():
+        return db.get_lecture_instance(lecture_instance_id).data["timetable_lectures"]["teacher_id"]
+
+    try:
+        teacher_id = _lecture_teachers.get_or_load(lecture_instance_id, owner)
+    except Exception as e:
+        print(f"[TEACHER CONTEXT] Owner lookup failed for {lecture_instance_id}, dropping all: {e}")
+        _cache.clear()
+        return
+
+    _cache.invalidate(teacher_id)
+
+
+def stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,90 @@
+# utils/token_budget.py
+import os
+import re
+
+# Rough local estimate: about 4 characters per token for English text.
+CHARS_PER_TOKEN = 4
+
+# Max tokens of variable input (OCR text / teacher context) sent per call.
+STAGE_BUDGETS = {
+    "aicheck": int(os.getenv("TOKEN_BUDGET_AICHECK", "1500")),
+    "decision": int(os.getenv("TOKEN_BUDGET_DECISION", "1500")),
+    "chatbot": int(os.getenv("TOKEN_BUDGET_CHATBOT", "6000")),
+    # Chat turns kept verbatim before older ones are summarized.
+    "chat_history": int(os.getenv("TOKEN_BUDGET_CHAT_HISTORY", "1500")),
+}
+
+TRUNCATION_MARKER = "\n[... truncated ...]\n"
+
+_usage = {}
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    return max(len(text.split()), -(-len(text) // CHARS_PER_TOKEN))
+
+
+def _head(text: str, tokens: int) -> str:
+    # Longest prefix within `tokens` by both the character and the word count.
+    piece = text[:tokens * CHARS_PER_TOKEN]
+    words = list(re.finditer(r"\S+", piece))
+    if len(words) > tokens:
+        piece = piece[:words[tokens].start()]
+    return piece
+
+
+def _tail(text: str, tokens: int) -> str:
+    piece = text[max(0, len(text) - tokens * CHARS_PER_TOKEN):] if tokens else ""
+    words = list(re.finditer(r"\S+", piece))
+    if len(words) > tokens:
+        piece = piece[words[len(words) - tokens].start():]
+    return piece
+
+
+def fit(text: str, stage: str) -> str:
+    """
+    Trims text to the stage budget, keeping the head and the tail so that
+    both the opening and any closing summary of the notes survive.
+    """
+    budget = STAGE_BUDGETS[stage]
+    if count_tokens(text) <= budget:
+        return text
+
+    # Cut against the same estimate count_tokens uses, so word-dense text
+    # is trimmed by words rather than by a character count it already meets.
+    keep = max(0, budget - count_tokens(TRUNCATION_MARKER))
+    head = keep * 3 // 4
+    print(f"[TOKEN BUDGET] {stage}: truncated ~{count_tokens(text)} tokens to {budget}")
+    _stage_usage(stage)["truncated"] += 1
+    return _head(text, head) + TRUNCATION_MARKER + _tail(text, keep - head)
+
+
+def _stage_usage(stage: str) -> dict:
+    return _usage.setdefault(stage, {
+        "calls": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "truncated": 0
+    })
+
+
+def record_usage(stage: str, completion):
+    """Logs and accumulates the provider-reported token usage of one call."""
+    usage = getattr(completion, "usage", None)
+    if usage is None:
+        return
+
+    prompt_tokens = usage.prompt_tokens or 0
+    completion_tokens = usage.completion_tokens or 0
+
+    stats = _stage_usage(stage)
+    stats["calls"] += 1
+    stats["prompt_tokens"] += prompt_tokens
+    stats["completion_tokens"] += completion_tokens
+
+    print(f"[TOKEN USAGE] {stage}: prompt={prompt_tokens} completion={completion_tokens}")
+
+
+def stats() -> dict:
+    return {stage: dict(values) for stage, values in _usage.items()}
@@ -0,0 +1,133 @@
+# utils/ttl_cache.py
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class TTLCache:
+    """
+    Thread-safe, size-capped cache with per-entry expiry. Concurrent misses
+    for the same key share one loader call (single-flight). Exceptions from
+    the loader are re-raised to every waiter and never cached.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        # Bumped on invalidation so a load that started earlier is not stored.
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._lookup(key)
+        return entry[0] if entry else default
+
+    def values(self) -> list:
+        """Live (unexpired) values, oldest use first."""
+        with self._lock:
+            now = time.monotonic()
+            return [value for value, expires_at in self._entries.values() if expires_at > now]
+
+    def set(self, key, value, ttl: float = None):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + (ttl if ttl is not None else self.ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader, ttl: float = None):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry:
+                self.hits += 1
+                return entry[0]
+
+            future = self._inflight.get(key)
+            if future is None:
+                self.misses += 1
+                future = Future()
+                self._inflight[key] = future
+                generation = self._generation
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            stale = generation != self._generation
+
+        if not stale:
+            self.set(key, value, ttl)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._generation += 1
+            self._inflight.pop(key, None)
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_matching(self, predicate):
+        """Drops every entry whose key satisfies predicate(key)."""
+        with self._lock:
+            self._generation += 1
+            for key in [k for k in self._inflight if predicate(k)]:
+                del self._inflight[key]
+            stale = [k for k in self._entries if predicate(k)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._inflight.clear()
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
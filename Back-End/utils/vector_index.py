@@ -0,0 +1,148 @@
+# utils/vector_index.py
+import asyncio
+import json
+import os
+import numpy as np
+import database_function as db
+from utils.ttl_cache import TTLCache
+
+INITIAL_CAPACITY = 64
+VECTOR_INDEX_TTL = int(os.getenv("VECTOR_INDEX_TTL", "21600"))
+VECTOR_INDEX_MAX_LECTURES = int(os.getenv("VECTOR_INDEX_MAX_LECTURES", "200"))
+
+# lecture_instance_id -> LectureIndex. Lectures that are never closed
+# drop out after VECTOR_INDEX_TTL idle, or least recently used first.
+_indexes = TTLCache("vector_index", VECTOR_INDEX_MAX_LECTURES, VECTOR_INDEX_TTL)
+_load_locks = {}
+# Lectures evicted on close; their similarity search goes to the database
+# instead. A marker that expires only lets a bounded index come back.
+_closed = TTLCache("closed_lectures", 10000, VECTOR_INDEX_TTL)
+
+
+def to_vector(value):
+    """Embeddings come back from PostgREST as '[0.1,...]' strings."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    if len(value) == 0:
+        return None
+    return np.asarray(value, dtype=np.float32)
+
+
+def _normalize(vector: np.ndarray):
+    norm = np.linalg.norm(vector)
+    if not norm:
+        return None
+    return vector / norm
+
+
+class LectureIndex:
+    """Contiguous float32 matrix of unit-normalized embeddings for one lecture."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._matrix = np.empty((INITIAL_CAPACITY, dim), dtype=np.float32)
+        self._ids = []
+        self._positions = {}
+        self.closed = False
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, submission_id: str, vector: np.ndarray):
+        # Stages that fetched the index before eviction still add to it.
+        if self.closed or vector.shape != (self.dim,):
+            return
+
+        unit = _normalize(vector)
+        if unit is None:
+            return
+
+        # A reprocessed submission replaces its old embedding.
+        if submission_id in self._positions:
+            self._matrix[self._positions[submission_id]] = unit
+            return
+
+        size = len(self._ids)
+        if size == self._matrix.shape[0]:
+            grown = np.empty((size * 2, self.dim), dtype=np.float32)
+            grown[:size] = self._matrix
+            self._matrix = grown
+
+        self._matrix[size] = unit
+        self._positions[submission_id] = size
+        self._ids.append(submission_id)
+
+    def best_match(self, vector: np.ndarray, exclude_id: str = None):
+        """Returns (submission_id, cosine_similarity) of the closest peer, or None."""
+        unit = _normalize(vector) if vector.shape == (self.dim,) else None
+        size = len(self._ids)
+        if unit is None or size == 0:
+            return None
+
+        scores = self._matrix[:size] @ unit
+
+        if exclude_id in self._positions:
+            scores[self._positions[exclude_id]] = -np.inf
+
+        best = int(np.argmax(scores))
+        if not np.isfinite(scores[best]):
+            return None
+
+        return self._ids[best], float(scores[best])
+
+
+def _load(lecture_instance_id: str, dim: int) -> LectureIndex:
+    index = LectureIndex(dim)
+    rows = db.get_lecture_embeddings(lecture_instance_id).data or []
+
+    for row in rows:
+        vector = to_vector(row["embedding"])
+        if vector is not None:
+            index.add(row["id"], vector)
+
+    print(f"[VECTOR INDEX] Loaded {len(index)} embeddings for lecture {lecture_instance_id}")
+    return index
+
+
+async def get_index(lecture_instance_id: str, dim: int):
+    """The lecture's in-memory index, or None once the lecture has been closed."""
+    if _closed.get(lecture_instance_id):
+        return None
+
+    index = _indexes.get(lecture_instance_id)
+    if index is None:
+        lock = _load_locks.setdefault(lecture_instance_id, asyncio.Lock())
+        async with lock:
+            index = _indexes.get(lecture_instance_id)
+            if index is None and not _closed.get(lecture_instance_id):
+                index = await asyncio.to_thread(_load, lecture_instance_id, dim)
+        _load_locks.pop(lecture_instance_id, None)
+
+    # Closed while loading: don't bring the index back.
+    if index is None or _closed.get(lecture_instance_id):
+        return None
+
+    # Re-set on every use so only idle lectures expire.
+    _indexes.set(lecture_instance_id, index)
+    return index
+
+
+def evict(lecture_instance_id: str):
+    _closed.set(lecture_instance_id, True)
+    index = _indexes.get(lecture_instance_id)
+    _indexes.invalidate(lecture_instance_id)
+    if index is not None:
+        index.closed = True
+        print(f"[VECTOR INDEX] Evicted lecture {lecture_instance_id}")
+
+
+def stats() -> dict:
+    indexes = _indexes.values()
+    return {
+        "lectures": len(indexes),
+        "vectors": sum(len(index) for index in indexes),
+        "closed_lectures": _closed.stats()["entries"],
+        "evictions": _indexes.stats()["evictions"]
+    }
@@ -0,0 +1,158 @@
+-- Plagiarism similarity search benchmark.
+--
+-- Seeds N synthetic 768-d embeddings into a scratch schema, then reports
+-- p50/p99 latency of find_max_similarity_for_submission before (cast join,
+-- no indexes) and after (stored upload_date), once with each candidate
+-- index on its own:
+--   btree  (lecture_instance_id, upload_date), the index schema.sql ships
+--   hnsw   global HNSW on embedding, for comparison only
+--
+-- Usage:
+--   psql "$DATABASE_URL" -v n=20000 -v lectures=400 -v queries=200 \
+--        -f Database/benchmarks/similarity_benchmark.sql
+
+\set ON_ERROR_STOP on
+\if :{?n}
+\else
+  \set n 20000
+\endif
+\if :{?lectures}
+\else
+  \set lectures 400
+\endif
+\if :{?queries}
+\else
+  \set queries 200
+\endif
+
+drop schema if exists similarity_bench cascade;
+create schema similarity_bench;
+
+create table similarity_bench.submissions (
+  id uuid primary key default gen_random_uuid(),
+  class_id uuid not null,
+  lecture_instance_id uuid not null,
+  uploaded_at timestamp not null,
+  upload_date date generated always as (uploaded_at::date) stored,
+  embedding public.vector(768)
+);
+
+create table similarity_bench.timings (
+  id bigserial,
+  label text not null,
+  ms double precision not null
+);
+
+create table similarity_bench.lectures as
+select
+  i as lecture_no,
+  gen_random_uuid() as lecture_instance_id,
+  gen_random_uuid() as class_id,
+  current_date - (i % 120) as lecture_date
+from generate_series(0, :lectures - 1) i;
+
+insert into similarity_bench.submissions (class_id, lecture_instance_id, uploaded_at, embedding)
+select
+  l.class_id,
+  l.lecture_instance_id,
+  l.lecture_date + time '09:00' + (i % 50) * interval '1 minute',
+  (
+    select array_agg(random()::real)
+    from generate_series(1, 768)
+    where i > 0
+  )::public.vector(768)
+from generate_series(1, :n) i
+join similarity_bench.lectures l
+  on l.lecture_no = i % :lectures;
+
+analyze similarity_bench.submissions;
+
+-- Previous query shape: casts on both sides of the join, no usable index.
+create function similarity_bench.old_query(p_submission_id uuid)
+returns table (matched_submission_id uuid, similarity double precision)
+language sql as $$
+  with target as (
+    select id, embedding, class_id, uploaded_at::date as upload_date
+    from similarity_bench.submissions
+    where id = p_submission_id
+      and embedding is not null
+  )
+  select s.id, 1 - (s.embedding <=> t.embedding) as similarity
+  from similarity_bench.submissions s
+  join target t
+    on s.class_id = t.class_id
+   and s.uploaded_at::date = t.upload_date
+  where s.id != t.id
+    and s.embedding is not null
+  order by similarity desc
+  limit 1;
+$$;
+
+-- Current query shape from schema.sql.
+create function similarity_bench.new_query(p_submission_id uuid)
+returns table (matched_submission_id uuid, similarity double precision)
+language sql as $$
+  with target as (
+    select id, embedding, lecture_instance_id, upload_date
+    from similarity_bench.submissions
+    where id = p_submission_id
+      and embedding is not null
+  )
+  select s.id, 1 - (s.embedding <=> t.embedding) as similarity
+  from target t
+  join similarity_bench.submissions s
+    on s.lecture_instance_id = t.lecture_instance_id
+   and s.upload_date = t.upload_date
+  where s.id != t.id
+    and s.embedding is not null
+  order by s.embedding <=> t.embedding
+  limit 1;
+$$;
+
+create function similarity_bench.run(p_label text, p_queries int, p_new boolean)
+returns void
+language plpgsql as $$
+declare
+  r record;
+  t0 timestamptz;
+begin
+  for r in
+    select id from similarity_bench.submissions order by random() limit p_queries
+  loop
+    t0 := clock_timestamp();
+    if p_new then
+      perform * from similarity_bench.new_query(r.id);
+    else
+      perform * from similarity_bench.old_query(r.id);
+    end if;
+    insert into similarity_bench.timings
+    values (p_label, extract(epoch from clock_timestamp() - t0) * 1000);
+  end loop;
+end;
+$$;
+
+select similarity_bench.run('before', :queries, false);
+
+create index bench_btree_idx on similarity_bench.submissions (lecture_instance_id, upload_date)
+  where embedding is not null;
+analyze similarity_bench.submissions;
+
+select similarity_bench.run('after (btree)', :queries, true);
+
+drop index similarity_bench.bench_btree_idx;
+create index bench_hnsw_idx on similarity_bench.submissions
+  using hnsw (embedding public.vector_cosine_ops) with (m = 16, ef_construction = 64);
+analyze similarity_bench.submissions;
+
+select similarity_bench.run('after (hnsw)', :queries, true);
+
+select
+  label,
+  count(*) as queries,
+  round(percentile_cont(0.5) within group (order by ms)::numeric, 3) as p50_ms,
+  round(percentile_cont(0.99) within group (order by ms)::numeric, 3) as p99_ms
+from similarity_bench.timings
+group by label
+order by min(id);
+
+drop schema similarity_bench cascade;
@@ -0,0 +1,332 @@
+-- Teacher attendance overview benchmark.
+--
+-- Seeds a department (50 classes x 60 students x a semester of lectures,
+-- 2 classes per teacher) into a scratch schema, then reports p50/p99 of
+-- get_teacher_attendance_overview and of teacher_get_context's
+-- attendance_summary, before (aggregating attendance_registry on every
+-- call) and after (reading lecture_attendance_rollup). Also reports the
+-- cost the rollup trigger adds to decision updates.
+--
+-- Usage:
+--   psql "$DATABASE_URL" -v classes=50 -v students=60 -v weeks=16 -v queries=200 \
+--        -f Database/benchmarks/teacher_overview_benchmark.sql
+
+\set ON_ERROR_STOP on
+\if :{?classes}
+\else
+  \set classes 50
+\endif
+\if :{?students}
+\else
+  \set students 60
+\endif
+\if :{?weeks}
+\else
+  \set weeks 16
+\endif
+\if :{?queries}
+\else
+  \set queries 200
+\endif
+
+drop schema if exists teacher_overview_bench cascade;
+create schema teacher_overview_bench;
+set search_path = teacher_overview_bench, public;
+
+create table classes (
+  id uuid primary key default gen_random_uuid(),
+  class_no int not null,
+  class_code text not null,
+  class_name text not null
+);
+
+create table timetable_lectures (
+  id uuid primary key default gen_random_uuid(),
+  class_id uuid not null references classes (id),
+  teacher_id uuid not null,
+  day_of_week int not null,
+  start_time time not null
+);
+
+create table lecture_instances (
+  id uuid primary key default gen_random_uuid(),
+  timetable_lecture_id uuid not null references timetable_lectures (id),
+  lecture_date date not null,
+  start_time time not null,
+  unique (timetable_lecture_id, lecture_date)
+);
+
+create table attendance_registry (
+  user_id uuid not null,
+  lecture_instance_id uuid not null references lecture_instances (id) on delete cascade,
+  decision text default 'PENDING',
+  unique (user_id, lecture_instance_id)
+);
+
+create table lecture_attendance_rollup (
+  lecture_instance_id uuid primary key references lecture_instances (id) on delete cascade,
+  present_count integer not null default 0,
+  absent_count integer not null default 0,
+  od_count integer not null default 0,
+  pending_count integer not null default 0,
+  total_count integer not null default 0,
+  updated_at timestamptz default now()
+);
+
+create table timings (
+  label text not null,
+  ms double precision not null
+);
+
+-- Two classes per teacher, four one-hour lectures per class per week.
+insert into classes (class_no, class_code, class_name)
+select i, 'CS' || lpad(i::text, 3, '0'), 'Course ' || i
+from generate_series(1, :classes) i;
+
+create table teachers as
+select gen_random_uuid() as teacher_id, t as teacher_no
+from generate_series(0, (:classes + 1) / 2 - 1) t;
+
+insert into timetable_lectures (class_id, teacher_id, day_of_week, start_time)
+select c.id, t.teacher_id, 1 + (c.class_no + d) % 5, time '09:00' + ((c.class_no + d) % 5) * interval '1 hour'
+from classes c
+join teachers t on t.teacher_no = (c.class_no - 1) / 2
+cross join generate_series(0, 3) d;
+
+insert into lecture_instances (timetable_lecture_id, lecture_date, start_time)
+select tl.id, date_trunc('week', current_date)::date - w * 7 + (tl.day_of_week - 1), tl.start_time
+from timetable_lectures tl
+cross join generate_series(0, :weeks - 1) w;
+
+create table students as
+select c.id as class_id, gen_random_uuid() as user_id
+from classes c
+cross join generate_series(1, :students);
+
+insert into attendance_registry (user_id, lecture_instance_id, decision)
+select
+  s.user_id,
+  li.id,
+  case
+    when random() < 0.80 then 'PRESENT'
+    when random() < 0.85 then 'ABSENT'
+    when random() < 0.50 then 'OD'
+    else 'PENDING'
+  end
+from lecture_instances li
+join timetable_lectures tl on tl.id = li.timetable_lecture_id
+join students s on s.class_id = tl.class_id;
+
+analyze;
+
+select
+  (select count(*) from classes) as classes,
+  (select count(*) from teachers) as teachers,
+  (select count(*) from lecture_instances) as lecture_instances,
+  (select count(*) from attendance_registry) as attendance_rows;
+
+-- Previous query shapes: aggregate attendance_registry on every call.
+create function old_overview(p_teacher_id uuid, p_start date, p_end date)
+returns table (lecture_instance_id uuid, present bigint, absent bigint, od bigint, pending bigint, total bigint)
+language sql as $$
+  select li.id,
+    count(*) filter (where ar.decision = 'PRESENT'),
+    count(*) filter (where ar.decision = 'ABSENT'),
+    count(*) filter (where ar.decision = 'OD'),
+    count(*) filter (where ar.decision = 'PENDING'),
+    count(ar.user_id)
+  from lecture_instances li
+  join timetable_lectures tl on tl.id = li.timetable_lecture_id
+  join classes c on c.id = tl.class_id
+  join attendance_registry ar on ar.lecture_instance_id = li.id
+  where tl.teacher_id = p_teacher_id
+    and li.lecture_date between p_start and p_end
+  group by li.id, li.lecture_date, li.start_time, c.class_code, c.class_name
+  order by li.lecture_date, li.start_time;
+$$;
+
+create function old_context_summary(p_teacher_id uuid)
+returns json
+language sql as $$
+  select json_agg(y) from (
+    select li.id, li.lecture_date, c.class_code,
+      count(*) filter (where ar.decision = 'PRESENT') as present,
+      count(*) filter (where ar.decision = 'ABSENT') as absent,
+      count(*) filter (where ar.decision = 'OD') as od
+    from attendance_registry ar
+    join lecture_instances li on li.id = ar.lecture_instance_id
+    join timetable_lectures tl on tl.id = li.timetable_lecture_id
+    join classes c on c.id = tl.class_id
+    where tl.teacher_id = p_teacher_id
+    group by li.id, li.lecture_date, c.class_code
+    order by li.lecture_date desc
+  ) y;
+$$;
+
+-- Current query shapes from schema.sql.
+create function new_overview(p_teacher_id uuid, p_start date, p_end date)
+returns table (lecture_instance_id uuid, present bigint, absent bigint, od bigint, pending bigint, total bigint)
+language sql as $$
+  select li.id,
+    r.present_count::bigint, r.absent_count::bigint, r.od_count::bigint,
+    r.pending_count::bigint, r.total_count::bigint
+  from timetable_lectures tl
+  join lecture_instances li on li.timetable_lecture_id = tl.id
+  join classes c on c.id = tl.class_id
+  join lecture_attendance_rollup r on r.lecture_instance_id = li.id
+  where tl.teacher_id = p_teacher_id
+    and li.lecture_date between p_start and p_end
+    and r.total_count > 0
+  order by li.lecture_date, li.start_time;
+$$;
+
+create function new_context_summary(p_teacher_id uuid)
+returns json
+language sql as $$
+  select json_agg(y) from (
+    select li.id, li.lecture_date, c.class_code,
+      r.present_count as present, r.absent_count as absent, r.od_count as od
+    from lecture_attendance_rollup r
+    join lecture_instances li on li.id = r.lecture_instance_id
+    join timetable_lectures tl on tl.id = li.timetable_lecture_id
+    join classes c on c.id = tl.class_id
+    where tl.teacher_id = p_teacher_id
+      and r.total_count > 0
+    order by li.lecture_date desc
+  ) y;
+$$;
+
+create function run(p_label text, p_queries int, p_new boolean)
+returns void
+language plpgsql as $$
+declare
+  r record;
+  t0 timestamptz;
+  v_start date := current_date - 7 * 20;
+begin
+  for r in
+    select teacher_id from teachers, generate_series(1, p_queries / 2 + 1) order by random() limit p_queries
+  loop
+    t0 := clock_timestamp();
+    if p_new then
+      perform * from new_overview(r.teacher_id, v_start, current_date);
+    else
+      perform * from old_overview(r.teacher_id, v_start, current_date);
+    end if;
+    insert into timings values (p_label || ' overview', extract(epoch from clock_timestamp() - t0) * 1000);
+
+    t0 := clock_timestamp();
+    if p_new then
+      perform new_context_summary(r.teacher_id);
+    else
+      perform old_context_summary(r.teacher_id);
+    end if;
+    insert into timings values (p_label || ' context', extract(epoch from clock_timestamp() - t0) * 1000);
+  end loop;
+end;
+$$;
+
+create function time_updates(p_label text, p_rows int)
+returns void
+language plpgsql as $$
+declare
+  t0 timestamptz := clock_timestamp();
+begin
+  update attendance_registry
+  set decision = case decision when 'PRESENT' then 'ABSENT' else 'PRESENT' end
+  where ctid in (select ctid from attendance_registry order by random() limit p_rows);
+  insert into timings values (p_label, extract(epoch from clock_timestamp() - t0) * 1000 / p_rows);
+end;
+$$;
+
+select run('before', :queries, false);
+select time_updates('before update (per row)', 5000);
+
+-- Rollup, trigger and teacher index as in schema.sql.
+insert into lecture_attendance_rollup (
+  lecture_instance_id, present_count, absent_count, od_count, pending_count, total_count
+)
+select lecture_instance_id,
+  count(*) filter (where decision = 'PRESENT'),
+  count(*) filter (where decision = 'ABSENT'),
+  count(*) filter (where decision = 'OD'),
+  count(*) filter (where coalesce(decision, 'PENDING') = 'PENDING'),
+  count(*)
+from attendance_registry
+group by lecture_instance_id;
+
+create function maintain_rollup() returns trigger
+language plpgsql as $$
+begin
+  if tg_op = 'UPDATE'
+     and old.lecture_instance_id = new.lecture_instance_id
+     and coalesce(old.decision, 'PENDING') = coalesce(new.decision, 'PENDING') then
+    return null;
+  end if;
+  if tg_op in ('UPDATE', 'DELETE') then
+    update lecture_attendance_rollup
+    set present_count = present_count - (coalesce(old.decision, 'PENDING') = 'PRESENT')::int,
+        absent_count  = absent_count  - (coalesce(old.decision, 'PENDING') = 'ABSENT')::int,
+        od_count      = od_count      - (coalesce(old.decision, 'PENDING') = 'OD')::int,
+        pending_count = pending_count - (coalesce(old.decision, 'PENDING') = 'PENDING')::int,
+        total_count   = total_count - 1,
+        updated_at    = now()
+    where lecture_instance_id = old.lecture_instance_id;
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    insert into lecture_attendance_rollup as r (
+      lecture_instance_id, present_count, absent_count, od_count, pending_count, total_count
+    )
+    values (
+      new.lecture_instance_id,
+      (coalesce(new.decision, 'PENDING') = 'PRESENT')::int,
+      (coalesce(new.decision, 'PENDING') = 'ABSENT')::int,
+      (coalesce(new.decision, 'PENDING') = 'OD')::int,
+      (coalesce(new.decision, 'PENDING') = 'PENDING')::int,
+      1
+    )
+    on conflict (lecture_instance_id) do update
+    set present_count = r.present_count + excluded.present_count,
+        absent_count  = r.absent_count  + excluded.absent_count,
+        od_count      = r.od_count      + excluded.od_count,
+        pending_count = r.pending_count + excluded.pending_count,
+        total_count   = r.total_count   + excluded.total_count,
+        updated_at    = now();
+  end if;
+  return null;
+end;
+$$;
+
+create trigger trg_maintain_rollup
+after insert or delete or update of decision, lecture_instance_id on attendance_registry
+for each row execute function maintain_rollup();
+
+create index on timetable_lectures (teacher_id);
+analyze;
+
+select run('after', :queries, true);
+select time_updates('after update (per row)', 5000);
+
+-- The trigger-maintained counts must match a fresh aggregate.
+select count(*) as rollup_mismatches
+from lecture_attendance_rollup r
+join (
+  select lecture_instance_id,
+    count(*) filter (where decision = 'PRESENT') as present,
+    count(*) as total
+  from attendance_registry
+  group by lecture_instance_id
+) a using (lecture_instance_id)
+where r.present_count <> a.present or r.total_count <> a.total;
+
+select
+  label,
+  count(*) as samples,
+  round(percentile_cont(0.5) within group (order by ms)::numeric, 3) as p50_ms,
+  round(percentile_cont(0.99) within group (order by ms)::numeric, 3) as p99_ms
+from timings
+group by label
+order by label desc;
+
+reset search_path;
+drop schema teacher_overview_bench cascade;
@@ -87,6 +87,111 @@ $$;
 ALTER FUNCTION "public"."auto_close_scheduled_lectures"() OWNER TO "postgres";
 
 
+CREATE OR REPLACE FUNCTION "public"."bulk_update_attendance"("p_rows" "jsonb") RETURNS TABLE("row_index" integer, "user_id" "uuid", "username" "text", "lecture_instance_id" "uuid", "outcome" "text")
+    LANGUAGE "sql"
+    AS $$
+  -- p_rows: [{user_id | username, lecture_instance_id, decision, reason?, conceptual_understanding?}]
+  -- outcome: updated | unknown_user | invalid_decision | not_enrolled | superseded
+  with input as (
+    select
+      (r.ordinality - 1)::int as row_index,
+      (r.value ->> 'user_id')::uuid as user_id,
+      r.value ->> 'username' as username,
+      (r.value ->> 'lecture_instance_id')::uuid as lecture_instance_id,
+      r.value ->> 'decision' as decision,
+      r.value ->> 'reason' as reason,
+      r.value ->> 'conceptual_understanding' as conceptual_understanding
+    from jsonb_array_elements(p_rows) with ordinality as r(value, ordinality)
+  ),
+  resolved as (
+    select
+      i.*,
+      coalesce(pi.id, pu.id) as resolved_user_id,
+      coalesce(pi.username, pu.username, i.username) as resolved_username,
+      coalesce(i.decision in ('PENDING', 'PRESENT', 'ABSENT', 'OD'), false) as valid_decision
+    from input i
+    left join profiles pi on pi.id = i.user_id
+    left join profiles pu on i.user_id is null and pu.username = i.username
+  ),
+  ranked as (
+    -- The last row for a student and lecture wins
+    select
+      r.*,
+      row_number() over (
+        partition by r.resolved_user_id, r.lecture_instance_id, r.valid_decision
+        order by r.row_index desc
+      ) = 1 as latest
+    from resolved r
+  ),
+  updated as (
+    update attendance_registry ar
+    set decision = k.decision,
+        reason = coalesce(k.reason, ar.reason),
+        "Conceptual_Understanding" = coalesce(k.conceptual_understanding, ar."Conceptual_Understanding"),
+        updated_at = now()
+    from ranked k
+    where k.latest
+      and k.valid_decision
+      and ar.user_id = k.resolved_user_id
+      and ar.lecture_instance_id = k.lecture_instance_id
+    returning ar.user_id, ar.lecture_instance_id
+  )
+  select
+    k.row_index,
+    k.resolved_user_id,
+    k.resolved_username,
+    k.lecture_instance_id,
+    case
+      when k.resolved_user_id is null then 'unknown_user'
+      when not k.valid_decision then 'invalid_decision'
+      when not k.latest then 'superseded'
+      when u.user_id is not null then 'updated'
+      else 'not_enrolled'
+    end
+  from ranked k
+  left join updated u
+    on u.user_id = k.resolved_user_id
+   and u.lecture_instance_id = k.lecture_instance_id
+  order by k.row_index;
+$$;
+
+
+ALTER FUNCTION "public"."bulk_update_attendance"("p_rows" "jsonb") OWNER TO "postgres";
+
+
+CREATE OR REPLACE FUNCTION "public"."claim_resumable_submissions"("p_statuses" "text"[], "p_since" timestamp without time zone, "p_lease_seconds" integer) RETURNS TABLE("id" "uuid")
+    LANGUAGE "sql"
+    AS $$
+  -- Called by every web worker at startup; the claim makes sure only one of
+  -- them re-queues a given submission within the lease.
+  update submissions s
+  set resume_claimed_at = now()
+  where s.id in (
+    select c.id
+    from submissions c
+    where c.status = any (p_statuses)
+      and c.uploaded_at >= p_since
+      and (c.resume_claimed_at is null
+           or c.resume_claimed_at < now() - make_interval(secs => p_lease_seconds))
+      -- "All done" rows from before the decision stage set 'decided' were
+      -- already decided; only resume those still waiting on a decision.
+      and (c.status <> 'All done' or exists (
+        select 1
+        from attendance_registry ar
+        where ar.user_id = c.user_id
+          and ar.lecture_instance_id = c.lecture_instance_id
+          and coalesce(ar.decision, 'PENDING') = 'PENDING'
+      ))
+    order by c.uploaded_at
+    for update skip locked
+  )
+  returning s.id;
+$$;
+
+
+ALTER FUNCTION "public"."claim_resumable_submissions"("p_statuses" "text"[], "p_since" timestamp without time zone, "p_lease_seconds" integer) OWNER TO "postgres";
+
+
 CREATE OR REPLACE FUNCTION "public"."create_attendance_on_live"() RETURNS "trigger"
     LANGUAGE "plpgsql"
     AS $$
@@ -178,12 +283,14 @@ ALTER FUNCTION "public"."exec_sql"("sql" "text") OWNER TO "postgres";
 CREATE OR REPLACE FUNCTION "public"."find_max_similarity_for_submission"("p_submission_id" "uuid") RETURNS TABLE("matched_submission_id" "uuid", "similarity" double precision)
     LANGUAGE "sql" SECURITY DEFINER
     AS $$
+  -- Peers share the lecture instance (same class, same day). The stored
+  -- upload_date lets the composite index prune the partition directly.
   with target as (
     select
       id,
       embedding,
-      class_id,
-      uploaded_at::date as upload_date
+      lecture_instance_id,
+      upload_date
     from submissions
     where id = p_submission_id
       and embedding is not null
@@ -191,13 +298,13 @@ CREATE OR REPLACE FUNCTION "public"."find_max_similarity_for_submission"("p_subm
   select
     s.id as matched_submission_id,
     1 - (s.embedding <=> t.embedding) as similarity
-  from submissions s
-  join target t
-    on s.class_id = t.class_id
-   and s.uploaded_at::date = t.upload_date
+  from target t
+  join submissions s
+    on s.lecture_instance_id = t.lecture_instance_id
+   and s.upload_date = t.upload_date
   where s.id != t.id
     and s.embedding is not null
-  order by similarity desc
+  order by s.embedding <=> t.embedding
   limit 1;
 $$;
 
@@ -397,26 +504,21 @@ CREATE OR REPLACE FUNCTION "public"."get_teacher_attendance_overview"("p_teacher
     li.start_time,
     c.class_code,
     c.class_name,
-    count(*) filter (where ar.decision = 'PRESENT'),
-    count(*) filter (where ar.decision = 'ABSENT'),
-    count(*) filter (where ar.decision = 'OD'),
-    count(*) filter (where ar.decision = 'PENDING'),
-    count(ar.user_id)
-  from lecture_instances li
-  join timetable_lectures tl
-    on tl.id = li.timetable_lecture_id
+    r.present_count::bigint,
+    r.absent_count::bigint,
+    r.od_count::bigint,
+    r.pending_count::bigint,
+    r.total_count::bigint
+  from timetable_lectures tl
+  join lecture_instances li
+    on li.timetable_lecture_id = tl.id
   join classes c
     on c.id = tl.class_id
-  join attendance_registry ar
-    on ar.lecture_instance_id = li.id
+  join lecture_attendance_rollup r
+    on r.lecture_instance_id = li.id
   where tl.teacher_id = p_teacher_id
     and li.lecture_date between p_start_date and p_end_date
-  group by
-    li.id,
-    li.lecture_date,
-    li.start_time,
-    c.class_code,
-    c.class_name
+    and r.total_count > 0
   order by li.lecture_date, li.start_time;
 $$;
 
@@ -590,6 +692,178 @@ $$;
 ALTER FUNCTION "public"."get_today_lectures_for_teacher"("p_teacher_id" "uuid") OWNER TO "postgres";
 
 
+CREATE OR REPLACE FUNCTION "public"."maintain_lecture_attendance_rollup"() RETURNS "trigger"
+    LANGUAGE "plpgsql"
+    AS $$
+begin
+  if tg_op = 'UPDATE'
+     and old.lecture_instance_id = new.lecture_instance_id
+     and coalesce(old.decision, 'PENDING') = coalesce(new.decision, 'PENDING') then
+    return null;
+  end if;
+
+  -- Take the old row out of its lecture's counts
+  if tg_op in ('UPDATE', 'DELETE') then
+    update lecture_attendance_rollup
+    set present_count = present_count - (coalesce(old.decision, 'PENDING') = 'PRESENT')::int,
+        absent_count  = absent_count  - (coalesce(old.decision, 'PENDING') = 'ABSENT')::int,
+        od_count      = od_count      - (coalesce(old.decision, 'PENDING') = 'OD')::int,
+        pending_count = pending_count - (coalesce(old.decision, 'PENDING') = 'PENDING')::int,
+        total_count   = total_count - 1,
+        updated_at    = now()
+    where lecture_instance_id = old.lecture_instance_id;
+  end if;
+
+  -- Add the new row to its lecture's counts
+  if tg_op in ('INSERT', 'UPDATE') then
+    insert into lecture_attendance_rollup as r (
+      lecture_instance_id, present_count, absent_count, od_count, pending_count, total_count
+    )
+    values (
+      new.lecture_instance_id,
+      (coalesce(new.decision, 'PENDING') = 'PRESENT')::int,
+      (coalesce(new.decision, 'PENDING') = 'ABSENT')::int,
+      (coalesce(new.decision, 'PENDING') = 'OD')::int,
+      (coalesce(new.decision, 'PENDING') = 'PENDING')::int,
+      1
+    )
+    on conflict (lecture_instance_id) do update
+    set present_count = r.present_count + excluded.present_count,
+        absent_count  = r.absent_count  + excluded.absent_count,
+        od_count      = r.od_count      + excluded.od_count,
+        pending_count = r.pending_count + excluded.pending_count,
+        total_count   = r.total_count   + excluded.total_count,
+        updated_at    = now();
+  end if;
+
+  return null;
+end;
+$$;
+
+
+ALTER FUNCTION "public"."maintain_lecture_attendance_rollup"() OWNER TO "postgres";
+
+
+CREATE OR REPLACE FUNCTION "public"."maintain_student_class_attendance"() RETURNS "trigger"
+    LANGUAGE "plpgsql"
+    AS $$
+declare
+  v_class_id uuid;
+begin
+  if tg_op = 'UPDATE'
+     and old.user_id = new.user_id
+     and old.lecture_instance_id = new.lecture_instance_id
+     and coalesce(old.decision, 'PENDING') = coalesce(new.decision, 'PENDING') then
+    return null;
+  end if;
+
+  -- Take the old row out of its student/class totals
+  if tg_op in ('UPDATE', 'DELETE') then
+    select tl.class_id into v_class_id
+    from lecture_instances li
+    join timetable_lectures tl on tl.id = li.timetable_lecture_id
+    where li.id = old.lecture_instance_id;
+
+    update student_class_attendance
+    set present_count = present_count - (coalesce(old.decision, 'PENDING') = 'PRESENT')::int,
+        absent_count  = absent_count  - (coalesce(old.decision, 'PENDING') = 'ABSENT')::int,
+        od_count      = od_count      - (coalesce(old.decision, 'PENDING') = 'OD')::int,
+        pending_count = pending_count - (coalesce(old.decision, 'PENDING') = 'PENDING')::int,
+        total_count   = total_count - 1,
+        updated_at    = now()
+    where user_id = old.user_id
+      and class_id = v_class_id;
+  end if;
+
+  -- Add the new row to its student/class totals
+  if tg_op in ('INSERT', 'UPDATE') then
+    select tl.class_id into v_class_id
+    from lecture_instances li
+    join timetable_lectures tl on tl.id = li.timetable_lecture_id
+    where li.id = new.lecture_instance_id;
+
+    insert into student_class_attendance as sca (
+      user_id, class_id, present_count, absent_count, od_count, pending_count, total_count
+    )
+    values (
+      new.user_id,
+      v_class_id,
+      (coalesce(new.decision, 'PENDING') = 'PRESENT')::int,
+      (coalesce(new.decision, 'PENDING') = 'ABSENT')::int,
+      (coalesce(new.decision, 'PENDING') = 'OD')::int,
+      (coalesce(new.decision, 'PENDING') = 'PENDING')::int,
+      1
+    )
+    on conflict (user_id, class_id) do update
+    set present_count = sca.present_count + excluded.present_count,
+        absent_count  = sca.absent_count  + excluded.absent_count,
+        od_count      = sca.od_count      + excluded.od_count,
+        pending_count = sca.pending_count + excluded.pending_count,
+        total_count   = sca.total_count   + excluded.total_count,
+        updated_at    = now();
+  end if;
+
+  return null;
+end;
+$$;
+
+
+ALTER FUNCTION "public"."maintain_student_class_attendance"() OWNER TO "postgres";
+
+
+CREATE OR REPLACE FUNCTION "public"."refresh_lecture_attendance_rollup"() RETURNS "void"
+    LANGUAGE "sql"
+    AS $$
+  -- Full rebuild: run once after creating the table, or on a pg_cron
+  -- schedule as a safety net against drift.
+  delete from lecture_attendance_rollup;
+
+  insert into lecture_attendance_rollup (
+    lecture_instance_id, present_count, absent_count, od_count, pending_count, total_count
+  )
+  select
+    ar.lecture_instance_id,
+    count(*) filter (where ar.decision = 'PRESENT'),
+    count(*) filter (where ar.decision = 'ABSENT'),
+    count(*) filter (where ar.decision = 'OD'),
+    count(*) filter (where coalesce(ar.decision, 'PENDING') = 'PENDING'),
+    count(*)
+  from attendance_registry ar
+  group by ar.lecture_instance_id;
+$$;
+
+
+ALTER FUNCTION "public"."refresh_lecture_attendance_rollup"() OWNER TO "postgres";
+
+
+CREATE OR REPLACE FUNCTION "public"."refresh_student_class_attendance"() RETURNS "void"
+    LANGUAGE "sql"
+    AS $$
+  -- Full rebuild: run once after creating the table, or to repair drift
+  -- (e.g. rows removed by a cascading lecture delete).
+  delete from student_class_attendance;
+
+  insert into student_class_attendance (
+    user_id, class_id, present_count, absent_count, od_count, pending_count, total_count
+  )
+  select
+    ar.user_id,
+    tl.class_id,
+    count(*) filter (where ar.decision = 'PRESENT'),
+    count(*) filter (where ar.decision = 'ABSENT'),
+    count(*) filter (where ar.decision = 'OD'),
+    count(*) filter (where coalesce(ar.decision, 'PENDING') = 'PENDING'),
+    count(*)
+  from attendance_registry ar
+  join lecture_instances li on li.id = ar.lecture_instance_id
+  join timetable_lectures tl on tl.id = li.timetable_lecture_id
+  group by ar.user_id, tl.class_id;
+$$;
+
+
+ALTER FUNCTION "public"."refresh_student_class_attendance"() OWNER TO "postgres";
+
+
 CREATE OR REPLACE FUNCTION "public"."resolve_lecture_instance"("p_user_id" "uuid", "p_date" "date", "p_subject_code" "text", "p_slot_start" time without time zone, "p_slot_end" time without time zone) RETURNS TABLE("id" "uuid")
     LANGUAGE "sql"
     AS $$
@@ -665,15 +939,15 @@ BEGIN
           li.id AS lecture_instance_id,
           li.lecture_date,
           c.class_code,
-          COUNT(*) FILTER (WHERE ar.decision = 'PRESENT') AS present,
-          COUNT(*) FILTER (WHERE ar.decision = 'ABSENT') AS absent,
-          COUNT(*) FILTER (WHERE ar.decision = 'OD') AS od
-        FROM attendance_registry ar
-        JOIN lecture_instances li ON li.id = ar.lecture_instance_id
+          r.present_count AS present,
+          r.absent_count AS absent,
+          r.od_count AS od
+        FROM lecture_attendance_rollup r
+        JOIN lecture_instances li ON li.id = r.lecture_instance_id
         JOIN timetable_lectures tl ON tl.id = li.timetable_lecture_id
         JOIN classes c ON c.id = tl.class_id
         WHERE tl.teacher_id = p_teacher_id
-        GROUP BY li.id, li.lecture_date, c.class_code
+          AND r.total_count > 0
         ORDER BY li.lecture_date DESC
       ) y
     ), '[]'::json),
@@ -770,6 +1044,79 @@ $$;
 
 ALTER FUNCTION "public"."trg_create_lecture_instance"() OWNER TO "postgres";
 
+
+CREATE OR REPLACE FUNCTION "public"."validate_and_create_submission"("p_user_id" "uuid", "p_lecture_instance_id" "uuid", "p_image_url" "text", "p_uploaded_at" timestamp without time zone) RETURNS TABLE("submission_id" "uuid", "error_code" "text")
+    LANGUAGE "plpgsql"
+    AS $$
+DECLARE
+  v_status text;
+  v_locked boolean;
+  v_decision text;
+  v_submission_id uuid;
+BEGIN
+  -- error_code: LECTURE_NOT_FOUND | LECTURE_NOT_ACCEPTING | NOT_ENROLLED
+  --           | MARKED_ABSENT | DUPLICATE_SUBMISSION
+  SELECT li.status, li.attendance_locked
+  INTO v_status, v_locked
+  FROM lecture_instances li
+  WHERE li.id = p_lecture_instance_id;
+
+  IF NOT FOUND THEN
+    RETURN QUERY SELECT NULL::uuid, 'LECTURE_NOT_FOUND'::text;
+    RETURN;
+  END IF;
+
+  IF v_locked OR v_status IS DISTINCT FROM 'live' THEN
+    RETURN QUERY SELECT NULL::uuid, 'LECTURE_NOT_ACCEPTING'::text;
+    RETURN;
+  END IF;
+
+  -- Locking the attendance row serializes concurrent uploads by the same
+  -- student, so the duplicate check below cannot race.
+  SELECT ar.decision
+  INTO v_decision
+  FROM attendance_registry ar
+  WHERE ar.user_id = p_user_id
+    AND ar.lecture_instance_id = p_lecture_instance_id
+  FOR UPDATE;
+
+  IF NOT FOUND THEN
+    RETURN QUERY SELECT NULL::uuid, 'NOT_ENROLLED'::text;
+    RETURN;
+  END IF;
+
+  IF v_decision = 'ABSENT' THEN
+    RETURN QUERY SELECT NULL::uuid, 'MARKED_ABSENT'::text;
+    RETURN;
+  END IF;
+
+  IF EXISTS (
+    SELECT 1
+    FROM submissions s
+    WHERE s.user_id = p_user_id
+      AND s.lecture_instance_id = p_lecture_instance_id
+  ) THEN
+    RETURN QUERY SELECT NULL::uuid, 'DUPLICATE_SUBMISSION'::text;
+    RETURN;
+  END IF;
+
+  INSERT INTO submissions (user_id, lecture_instance_id, uploaded_at, image_url, status)
+  VALUES (p_user_id, p_lecture_instance_id, p_uploaded_at, p_image_url, 'pending')
+  RETURNING id INTO v_submission_id;
+
+  UPDATE attendance_registry ar
+  SET decision = 'PENDING',
+      updated_at = now()
+  WHERE ar.user_id = p_user_id
+    AND ar.lecture_instance_id = p_lecture_instance_id;
+
+  RETURN QUERY SELECT v_submission_id, NULL::text;
+END;
+$$;
+
+
+ALTER FUNCTION "public"."validate_and_create_submission"("p_user_id" "uuid", "p_lecture_instance_id" "uuid", "p_image_url" "text", "p_uploaded_at" timestamp without time zone) OWNER TO "postgres";
+
 SET default_tablespace = '';
 
 SET default_table_access_method = "heap";
@@ -850,6 +1197,23 @@ CREATE TABLE IF NOT EXISTS "public"."lecture_instances" (
 ALTER TABLE "public"."lecture_instances" OWNER TO "postgres";
 
 
+CREATE TABLE IF NOT EXISTS "public"."lecture_attendance_rollup" (
+    "lecture_instance_id" "uuid" NOT NULL,
+    "present_count" integer DEFAULT 0 NOT NULL,
+    "absent_count" integer DEFAULT 0 NOT NULL,
+    "od_count" integer DEFAULT 0 NOT NULL,
+    "pending_count" integer DEFAULT 0 NOT NULL,
+    "total_count" integer DEFAULT 0 NOT NULL,
+    "updated_at" timestamp with time zone DEFAULT "now"()
+);
+
+
+ALTER TABLE "public"."lecture_attendance_rollup" OWNER TO "postgres";
+
+
+COMMENT ON TABLE "public"."lecture_attendance_rollup" IS 'Per-lecture-instance attendance counts maintained by trg_maintain_lecture_attendance_rollup';
+
+
 CREATE TABLE IF NOT EXISTS "public"."profiles" (
     "id" "uuid" NOT NULL,
     "username" "text" NOT NULL,
@@ -864,6 +1228,24 @@ CREATE TABLE IF NOT EXISTS "public"."profiles" (
 ALTER TABLE "public"."profiles" OWNER TO "postgres";
 
 
+CREATE TABLE IF NOT EXISTS "public"."student_class_attendance" (
+    "user_id" "uuid" NOT NULL,
+    "class_id" "uuid" NOT NULL,
+    "present_count" integer DEFAULT 0 NOT NULL,
+    "absent_count" integer DEFAULT 0 NOT NULL,
+    "od_count" integer DEFAULT 0 NOT NULL,
+    "pending_count" integer DEFAULT 0 NOT NULL,
+    "total_count" integer DEFAULT 0 NOT NULL,
+    "updated_at" timestamp with time zone DEFAULT "now"()
+);
+
+
+ALTER TABLE "public"."student_class_attendance" OWNER TO "postgres";
+
+
+COMMENT ON TABLE "public"."student_class_attendance" IS 'Per-student, per-class attendance totals maintained by trg_maintain_student_class_attendance';
+
+
 CREATE TABLE IF NOT EXISTS "public"."submissions" (
     "id" "uuid" DEFAULT "gen_random_uuid"() NOT NULL,
     "user_id" "uuid",
@@ -878,7 +1260,11 @@ CREATE TABLE IF NOT EXISTS "public"."submissions" (
     "ai_score" integer,
     "ai_reason" "text",
     "ai_confidence" "text",
-    "ai_status" "text"
+    "ai_status" "text",
+    "image_hash" "text",
+    "embedding_model" "text",
+    "upload_date" "date" GENERATED ALWAYS AS (("uploaded_at")::"date") STORED,
+    "resume_claimed_at" timestamp with time zone
 );
 
 
@@ -941,6 +1327,11 @@ ALTER TABLE ONLY "public"."classes"
 
 
 
+ALTER TABLE ONLY "public"."lecture_attendance_rollup"
+    ADD CONSTRAINT "lecture_attendance_rollup_pkey" PRIMARY KEY ("lecture_instance_id");
+
+
+
 ALTER TABLE ONLY "public"."lecture_instances"
     ADD CONSTRAINT "lecture_instances_pkey" PRIMARY KEY ("id");
 
@@ -961,6 +1352,11 @@ ALTER TABLE ONLY "public"."profiles"
 
 
 
+ALTER TABLE ONLY "public"."student_class_attendance"
+    ADD CONSTRAINT "student_class_attendance_pkey" PRIMARY KEY ("user_id", "class_id");
+
+
+
 ALTER TABLE ONLY "public"."submissions"
     ADD CONSTRAINT "submissions_pkey" PRIMARY KEY ("id");
 
@@ -1001,6 +1397,18 @@ ALTER TABLE ONLY "public"."attendance_registry"
 
 
 
+CREATE INDEX "submissions_lecture_upload_date_idx" ON "public"."submissions" USING "btree" ("lecture_instance_id", "upload_date") WHERE ("embedding" IS NOT NULL);
+
+
+
+CREATE INDEX "submissions_lecture_image_hash_idx" ON "public"."submissions" USING "btree" ("lecture_instance_id", "image_hash");
+
+
+
+CREATE INDEX "timetable_lectures_teacher_id_idx" ON "public"."timetable_lectures" USING "btree" ("teacher_id");
+
+
+
 CREATE OR REPLACE TRIGGER "/do" AFTER UPDATE ON "public"."timetable_lectures" FOR EACH ROW EXECUTE FUNCTION "public"."trg_create_lecture_instance"();
 
 
@@ -1013,6 +1421,14 @@ CREATE OR REPLACE TRIGGER "trg_create_attendance_on_live" AFTER UPDATE OF "statu
 
 
 
+CREATE OR REPLACE TRIGGER "trg_maintain_lecture_attendance_rollup" AFTER INSERT OR DELETE OR UPDATE OF "decision", "lecture_instance_id" ON "public"."attendance_registry" FOR EACH ROW EXECUTE FUNCTION "public"."maintain_lecture_attendance_rollup"();
+
+
+
+CREATE OR REPLACE TRIGGER "trg_maintain_student_class_attendance" AFTER INSERT OR DELETE OR UPDATE OF "decision", "user_id", "lecture_instance_id" ON "public"."attendance_registry" FOR EACH ROW EXECUTE FUNCTION "public"."maintain_student_class_attendance"();
+
+
+
 ALTER TABLE ONLY "public"."attendance_appeals"
     ADD CONSTRAINT "attendance_appeals_lecture_instance_id_fkey" FOREIGN KEY ("lecture_instance_id") REFERENCES "public"."lecture_instances"("id") ON DELETE CASCADE;
 
@@ -1038,6 +1454,11 @@ ALTER TABLE ONLY "public"."class_students"
 
 
 
+ALTER TABLE ONLY "public"."lecture_attendance_rollup"
+    ADD CONSTRAINT "lecture_attendance_rollup_lecture_instance_id_fkey" FOREIGN KEY ("lecture_instance_id") REFERENCES "public"."lecture_instances"("id") ON DELETE CASCADE;
+
+
+
 ALTER TABLE ONLY "public"."lecture_instances"
     ADD CONSTRAINT "lecture_instances_timetable_lecture_id_fkey" FOREIGN KEY ("timetable_lecture_id") REFERENCES "public"."timetable_lectures"("id") ON DELETE CASCADE;
 
@@ -1048,6 +1469,16 @@ ALTER TABLE ONLY "public"."profiles"
 
 
 
+ALTER TABLE ONLY "public"."student_class_attendance"
+    ADD CONSTRAINT "student_class_attendance_class_id_fkey" FOREIGN KEY ("class_id") REFERENCES "public"."classes"("id") ON UPDATE CASCADE ON DELETE CASCADE;
+
+
+
+ALTER TABLE ONLY "public"."student_class_attendance"
+    ADD CONSTRAINT "student_class_attendance_user_id_fkey" FOREIGN KEY ("user_id") REFERENCES "public"."profiles"("id") ON UPDATE CASCADE ON DELETE CASCADE;
+
+
+
 ALTER TABLE ONLY "public"."submissions"
     ADD CONSTRAINT "submissions_lecture_instance_id_fkey" FOREIGN KEY ("lecture_instance_id") REFERENCES "public"."lecture_instances"("id") ON UPDATE CASCADE ON DELETE CASCADE;
 
@@ -1540,6 +1971,18 @@ GRANT ALL ON FUNCTION "public"."binary_quantize"("public"."vector") TO "service_
 
 
 
+GRANT ALL ON FUNCTION "public"."bulk_update_attendance"("p_rows" "jsonb") TO "anon";
+GRANT ALL ON FUNCTION "public"."bulk_update_attendance"("p_rows" "jsonb") TO "authenticated";
+GRANT ALL ON FUNCTION "public"."bulk_update_attendance"("p_rows" "jsonb") TO "service_role";
+
+
+
+GRANT ALL ON FUNCTION "public"."claim_resumable_submissions"("p_statuses" "text"[], "p_since" timestamp without time zone, "p_lease_seconds" integer) TO "anon";
+GRANT ALL ON FUNCTION "public"."claim_resumable_submissions"("p_statuses" "text"[], "p_since" timestamp without time zone, "p_lease_seconds" integer) TO "authenticated";
+GRANT ALL ON FUNCTION "public"."claim_resumable_submissions"("p_statuses" "text"[], "p_since" timestamp without time zone, "p_lease_seconds" integer) TO "service_role";
+
+
+
 GRANT ALL ON FUNCTION "public"."cosine_distance"("public"."halfvec", "public"."halfvec") TO "postgres";
 GRANT ALL ON FUNCTION "public"."cosine_distance"("public"."halfvec", "public"."halfvec") TO "anon";
 GRANT ALL ON FUNCTION "public"."cosine_distance"("public"."halfvec", "public"."halfvec") TO "authenticated";
@@ -1937,6 +2380,30 @@ GRANT ALL ON FUNCTION "public"."l2_normalize"("public"."vector") TO "service_rol
 
 
 
+GRANT ALL ON FUNCTION "public"."maintain_lecture_attendance_rollup"() TO "anon";
+GRANT ALL ON FUNCTION "public"."maintain_lecture_attendance_rollup"() TO "authenticated";
+GRANT ALL ON FUNCTION "public"."maintain_lecture_attendance_rollup"() TO "service_role";
+
+
+
+GRANT ALL ON FUNCTION "public"."maintain_student_class_attendance"() TO "anon";
+GRANT ALL ON FUNCTION "public"."maintain_student_class_attendance"() TO "authenticated";
+GRANT ALL ON FUNCTION "public"."maintain_student_class_attendance"() TO "service_role";
+
+
+
+GRANT ALL ON FUNCTION "public"."refresh_lecture_attendance_rollup"() TO "anon";
+GRANT ALL ON FUNCTION "public"."refresh_lecture_attendance_rollup"() TO "authenticated";
+GRANT ALL ON FUNCTION "public"."refresh_lecture_attendance_rollup"() TO "service_role";
+
+
+
+GRANT ALL ON FUNCTION "public"."refresh_student_class_attendance"() TO "anon";
+GRANT ALL ON FUNCTION "public"."refresh_student_class_attendance"() TO "authenticated";
+GRANT ALL ON FUNCTION "public"."refresh_student_class_attendance"() TO "service_role";
+
+
+
 GRANT ALL ON FUNCTION "public"."resolve_lecture_instance"("p_user_id" "uuid", "p_date" "date", "p_subject_code" "text", "p_slot_start" time without time zone, "p_slot_end" time without time zone) TO "anon";
 GRANT ALL ON FUNCTION "public"."resolve_lecture_instance"("p_user_id" "uuid", "p_date" "date", "p_subject_code" "text", "p_slot_start" time without time zone, "p_slot_end" time without time zone) TO "authenticated";
 GRANT ALL ON FUNCTION "public"."resolve_lecture_instance"("p_user_id" "uuid", "p_date" "date", "p_subject_code" "text", "p_slot_start" time without time zone, "p_slot_end" time without time zone) TO "service_role";
@@ -2032,6 +2499,12 @@ GRANT ALL ON FUNCTION "public"."trg_create_lecture_instance"() TO "service_role"
 
 
 
+GRANT ALL ON FUNCTION "public"."validate_and_create_submission"("p_user_id" "uuid", "p_lecture_instance_id" "uuid", "p_image_url" "text", "p_uploaded_at" timestamp without time zone) TO "anon";
+GRANT ALL ON FUNCTION "public"."validate_and_create_submission"("p_user_id" "uuid", "p_lecture_instance_id" "uuid", "p_image_url" "text", "p_uploaded_at" timestamp without time zone) TO "authenticated";
+GRANT ALL ON FUNCTION "public"."validate_and_create_submission"("p_user_id" "uuid", "p_lecture_instance_id" "uuid", "p_image_url" "text", "p_uploaded_at" timestamp without time zone) TO "service_role";
+
+
+
 GRANT ALL ON FUNCTION "public"."vector_accum"(double precision[], "public"."vector") TO "postgres";
 GRANT ALL ON FUNCTION "public"."vector_accum"(double precision[], "public"."vector") TO "anon";
 GRANT ALL ON FUNCTION "public"."vector_accum"(double precision[], "public"."vector") TO "authenticated";
@@ -2245,6 +2718,12 @@ GRANT ALL ON TABLE "public"."classes" TO "service_role";
 
 
 
+GRANT ALL ON TABLE "public"."lecture_attendance_rollup" TO "anon";
+GRANT ALL ON TABLE "public"."lecture_attendance_rollup" TO "authenticated";
+GRANT ALL ON TABLE "public"."lecture_attendance_rollup" TO "service_role";
+
+
+
 GRANT ALL ON TABLE "public"."lecture_instances" TO "anon";
 GRANT ALL ON TABLE "public"."lecture_instances" TO "authenticated";
 GRANT ALL ON TABLE "public"."lecture_instances" TO "service_role";
@@ -2257,6 +2736,12 @@ GRANT ALL ON TABLE "public"."profiles" TO "service_role";
 
 
 
+GRANT ALL ON TABLE "public"."student_class_attendance" TO "anon";
+GRANT ALL ON TABLE "public"."student_class_attendance" TO "authenticated";
+GRANT ALL ON TABLE "public"."student_class_attendance" TO "service_role";
+
+
+
 GRANT ALL ON TABLE "public"."submissions" TO "anon";
 GRANT ALL ON TABLE "public"."submissions" TO "authenticated";
 GRANT ALL ON TABLE "public"."submissions" TO "service_role";
@@ -1,5 +1,5 @@
 import { useState, useRef, useEffect } from 'react'
-import { teacherChat } from '../services/lectureService'
+import { teacherChatStream } from '../services/lectureService'
 import './Chatbot.css'
 
 const Chatbot = ({ teacherId }) => {
@@ -9,7 +9,10 @@ const Chatbot = ({ teacherId }) => {
     ])
     const [input, setInput] = useState('')
     const [loading, setLoading] = useState(false)
+    const [streaming, setStreaming] = useState(false)
     const messagesEndRef = useRef(null)
+    // History lives on the server; only the session id is sent back
+    const sessionIdRef = useRef(null)
 
     const scrollToBottom = () => {
         messagesEndRef.current?.scrollIntoView({ behavior: "smooth" })
@@ -30,8 +33,21 @@ const Chatbot = ({ teacherId }) => {
         setLoading(true)
 
         try {
-            const response = await teacherChat(teacherId, userMessage)
-            setMessages(prev => [...prev, { role: 'assistant', content: response.reply }])
+            let started = false
+            const { sessionId } = await teacherChatStream(teacherId, userMessage, (text) => {
+                if (!started) {
+                    // First token replaces the typing indicator with the reply bubble
+                    started = true
+                    setStreaming(true)
+                    setMessages(prev => [...prev, { role: 'assistant', content: text }])
+                    return
+                }
+                setMessages(prev => {
+                    const last = prev[prev.length - 1]
+                    return [...prev.slice(0, -1), { ...last, content: last.content + text }]
+                })
+            }, sessionIdRef.current)
+            sessionIdRef.current = sessionId
         } catch (err) {
             setMessages(prev => [...prev, {
                 role: 'assistant',
@@ -39,6 +55,7 @@ const Chatbot = ({ teacherId }) => {
             }])
         } finally {
             setLoading(false)
+            setStreaming(false)
         }
     }
 
@@ -93,7 +110,7 @@ const Chatbot = ({ teacherId }) => {
                             </div>
                         </div>
                     ))}
-                    {loading && (
+                    {loading && !streaming && (
                         <div className="message assistant">
                             <div className="message-avatar">🤖</div>
                             <div className="message-content typing">
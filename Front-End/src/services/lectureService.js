@@ -55,6 +55,31 @@ export const getSubmissionStatus = async (submissionId) => {
   return response.data
 }
 
+// Server-sent status events; returns a function that closes the stream.
+// Closing on `done` stops EventSource from reconnecting after the server ends it.
+const subscribe = (path, params, onEvent, done = () => false) => {
+  const url = new URL(path, api.defaults.baseURL)
+  Object.entries(params).forEach(([key, value]) => url.searchParams.set(key, value))
+
+  const source = new EventSource(url)
+  const handle = (e) => {
+    const data = JSON.parse(e.data)
+    onEvent(data)
+    if (done(data)) source.close()
+  }
+  source.addEventListener('snapshot', handle)
+  source.addEventListener('status', handle)
+
+  return () => source.close()
+}
+
+export const subscribeSubmissionStatus = (submissionId, userId, onEvent) =>
+  subscribe(`/submissions/${submissionId}/events`, { user_id: userId }, onEvent,
+    (data) => data.status === 'decided')
+
+export const subscribeLectureStatus = (lectureInstanceId, teacherId, onEvent) =>
+  subscribe(`/teacher/lectures/${lectureInstanceId}/events`, { teacher_id: teacherId }, onEvent)
+
 export const resolveLectureInstance = async (userId, date, hourSlot, subjectCode) => {
   const response = await api.post('/lectures/resolve', null, {
     params: {
@@ -166,12 +191,47 @@ export const markStudentsAbsent = async (lectureInstanceId, usernames) => {
   return response.data
 }
 
-export const teacherChat = async (teacherId, message) => {
+export const teacherChat = async (teacherId, message, sessionId = null) => {
   const response = await api.post('/teacher/chat', null, {
     params: {
       teacher_id: teacherId,
-      message: message
+      message: message,
+      session_id: sessionId
     }
   })
   return response.data
 }
+
+// Calls onToken with each piece of the reply as it streams. Resolves with
+// the full reply and the session id to send with the next message.
+export const teacherChatStream = async (teacherId, message, onToken, sessionId = null) => {
+  const url = new URL('/teacher/chat/stream', api.defaults.baseURL)
+  url.searchParams.set('teacher_id', teacherId)
+  url.searchParams.set('message', message)
+  if (sessionId) url.searchParams.set('session_id', sessionId)
+
+  const token = localStorage.getItem('Token')
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: token ? { Authorization: `Bearer ${token}` } : {}
+  })
+
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}))
+    throw new Error(body.detail || `Request failed with status ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let reply = ''
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    const text = decoder.decode(value, { stream: true })
+    reply += text
+    onToken(text)
+  }
+
+  return { reply, sessionId: response.headers.get('X-Chat-Session') }
+}